@@ -0,0 +1,31 @@
+-- Prevent overlapping bookings for the same venue at the database level
+-- Replaces the check-then-insert conflict query, which is not safe when two
+-- requests for the same slot run concurrently
+
+-- btree_gist lets the GiST index compare venue_id with =
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- Existing overlaps must be resolved before the constraint can be added.
+-- This lists them:
+--
+-- SELECT a.id, b.id, a.venue_id, a.booking_date, a.start_time, a.end_time
+-- FROM public.booking a
+-- JOIN public.booking b
+--   ON a.venue_id = b.venue_id AND a.id < b.id
+--  AND a.status NOT IN ('cancelled', 'refunded')
+--  AND b.status NOT IN ('cancelled', 'refunded')
+--  AND tsrange(a.booking_date + a.start_time, a.booking_date + a.end_time + CASE WHEN a.end_time <= a.start_time THEN INTERVAL '1 day' ELSE INTERVAL '0' END, '[)')
+--   && tsrange(b.booking_date + b.start_time, b.booking_date + b.end_time + CASE WHEN b.end_time <= b.start_time THEN INTERVAL '1 day' ELSE INTERVAL '0' END, '[)');
+
+-- Active bookings of a venue may not overlap. A booking whose end_time is not
+-- after its start_time runs past midnight into the next day.
+ALTER TABLE public.booking DROP CONSTRAINT IF EXISTS booking_no_overlap;
+ALTER TABLE public.booking
+  ADD CONSTRAINT booking_no_overlap EXCLUDE USING gist (
+    venue_id WITH =,
+    tsrange(
+      booking_date + start_time,
+      booking_date + end_time + CASE WHEN end_time <= start_time THEN INTERVAL '1 day' ELSE INTERVAL '0' END,
+      '[)'
+    ) WITH &&
+  ) WHERE (status NOT IN ('cancelled', 'refunded'));
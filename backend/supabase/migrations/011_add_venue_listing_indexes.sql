@@ -0,0 +1,19 @@
+-- Indexes for cursor-paginated, filtered venue listing
+-- GET /api/v1/venues/?limit=&cursor=&game_type=&city= pages through
+-- adminvenues ordered by (created_at DESC, id DESC)
+
+-- Keyset pagination compares (created_at, id), so created_at must be set
+UPDATE public.adminvenues SET created_at = TIMEZONE('utc', NOW()) WHERE created_at IS NULL;
+ALTER TABLE public.adminvenues ALTER COLUMN created_at SET DEFAULT TIMEZONE('utc', NOW());
+ALTER TABLE public.adminvenues ALTER COLUMN created_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_adminvenues_created_at_id
+  ON public.adminvenues(created_at DESC, id DESC);
+
+-- game_type and city filters are case-insensitive substring matches (ILIKE)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_adminvenues_game_type_trgm
+  ON public.adminvenues USING gin (game_type gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_adminvenues_location_trgm
+  ON public.adminvenues USING gin (location gin_trgm_ops);
@@ -0,0 +1,10 @@
+-- Index for the paginated "my bookings" endpoint
+-- GET /api/v1/bookings/my-bookings reads one user's bookings ordered by
+-- (booking_date DESC, start_time DESC, id DESC) and pages with a cursor on
+-- the same key, so a single index range scan serves every page
+
+CREATE INDEX IF NOT EXISTS idx_bookings_user_date_time
+  ON public.booking(user_id, booking_date DESC, start_time DESC, id DESC);
+
+-- Covered by the composite index above
+DROP INDEX IF EXISTS public.idx_bookings_user_id;
@@ -0,0 +1,44 @@
+-- Index for pending OTP lookups and retention sweeps
+-- Pending codes live in the API's OTP store; this table is an audit log.
+-- Marking a code verified updates the unverified rows for one phone number,
+-- and the partial index covers exactly those rows, so it stays small however
+-- much history the table holds.
+
+CREATE INDEX IF NOT EXISTS idx_otp_pending_phone_created
+  ON public.otp_verifications(phone_number, created_at DESC)
+  WHERE is_verified = false;
+
+-- The API deletes rows older than OTP_RETENTION_HOURS in small batches using
+-- idx_otp_expires_at (see app/utils/otp_sweeper.py). Keep the old cleanup
+-- function in step with it.
+CREATE OR REPLACE FUNCTION public.cleanup_expired_otps()
+RETURNS void AS $$
+BEGIN
+  DELETE FROM public.otp_verifications
+  WHERE expires_at < NOW() - INTERVAL '24 hours';
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Optional: daily partitions for very high OTP volume.
+-- Dropping a day's partition is O(1) and leaves no dead tuples to vacuum,
+-- unlike batched deletes. Partitioned tables need the partition key in the
+-- primary key, so the table is rebuilt rather than altered. To adopt it,
+-- run the statements below in a maintenance window, create each day's
+-- partition ahead of time (e.g. with pg_partman or a pg_cron job), drop
+-- partitions older than the retention window, and set
+-- OTP_SWEEP_INTERVAL_SECONDS=0 for the API.
+--
+-- ALTER TABLE public.otp_verifications RENAME TO otp_verifications_old;
+-- CREATE TABLE public.otp_verifications (
+--   LIKE public.otp_verifications_old INCLUDING DEFAULTS,
+--   PRIMARY KEY (id, created_at)
+-- ) PARTITION BY RANGE (created_at);
+-- CREATE TABLE public.otp_verifications_2026_01_01
+--   PARTITION OF public.otp_verifications
+--   FOR VALUES FROM ('2026-01-01') TO ('2026-01-02');
+-- CREATE INDEX ON public.otp_verifications(phone_number, created_at DESC)
+--   WHERE is_verified = false;
+-- CREATE INDEX ON public.otp_verifications(expires_at);
+-- INSERT INTO public.otp_verifications SELECT * FROM public.otp_verifications_old;
+-- DROP TABLE public.otp_verifications_old;
+-- DROP TABLE public.otp_verifications_2026_01_01;  -- expiring a whole day
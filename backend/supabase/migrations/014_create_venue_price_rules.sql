@@ -0,0 +1,41 @@
+-- Structured venue pricing
+-- Each rule prices a time band at a venue, on one weekday or on every day.
+-- The API compiles a venue's rules into a per-minute price table in memory;
+-- minutes no rule covers fall back to the legacy adminvenues.prices value.
+
+CREATE TABLE IF NOT EXISTS public.venue_price_rules (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  venue_id UUID NOT NULL REFERENCES public.adminvenues(id) ON DELETE CASCADE,
+
+  -- 0 = Monday ... 6 = Sunday, NULL = every day
+  day_of_week SMALLINT CHECK (day_of_week BETWEEN 0 AND 6),
+
+  -- Half-open band [start_time, end_time). An end_time at or before
+  -- start_time runs past midnight, so 00:00 - 00:00 is the whole day.
+  start_time TIME NOT NULL,
+  end_time TIME NOT NULL,
+
+  price_per_hour DECIMAL(10,2) NOT NULL CHECK (price_per_hour >= 0),
+  is_peak BOOLEAN NOT NULL DEFAULT false,
+
+  -- Where rules overlap, weekday rules beat every-day rules, then the
+  -- higher priority wins
+  priority INTEGER NOT NULL DEFAULT 0,
+
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+CREATE INDEX IF NOT EXISTS idx_venue_price_rules_venue_id ON public.venue_price_rules(venue_id);
+
+-- The API notices rule changes through count(*) and max(updated_at)
+DROP TRIGGER IF EXISTS update_venue_price_rules_updated_at ON public.venue_price_rules;
+CREATE TRIGGER update_venue_price_rules_updated_at
+  BEFORE UPDATE ON public.venue_price_rules
+  FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
+
+ALTER TABLE public.venue_price_rules ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access on venue_price_rules"
+  ON public.venue_price_rules FOR SELECT
+  USING (true);
@@ -0,0 +1,22 @@
+-- Venue coordinates for "courts near me"
+-- GET /api/v1/venues/nearby?lat=&lng=&radius= is answered from a grid index
+-- the API builds over these columns when it loads the venue catalog. The
+-- btree index serves bounding-box queries made directly against the table.
+
+ALTER TABLE public.adminvenues
+  ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION CHECK (latitude BETWEEN -90 AND 90),
+  ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION CHECK (longitude BETWEEN -180 AND 180);
+
+-- Both or neither
+ALTER TABLE public.adminvenues DROP CONSTRAINT IF EXISTS adminvenues_coordinates_pair;
+ALTER TABLE public.adminvenues ADD CONSTRAINT adminvenues_coordinates_pair
+  CHECK ((latitude IS NULL) = (longitude IS NULL));
+
+CREATE INDEX IF NOT EXISTS idx_adminvenues_lat_lng
+  ON public.adminvenues(latitude, longitude)
+  WHERE latitude IS NOT NULL;
+
+-- With PostGIS available, a geography index can answer the same query in SQL:
+--   CREATE EXTENSION IF NOT EXISTS postgis;
+--   CREATE INDEX idx_adminvenues_geog ON public.adminvenues
+--     USING gist ((ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography));
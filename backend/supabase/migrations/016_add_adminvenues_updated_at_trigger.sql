@@ -0,0 +1,14 @@
+-- Keep adminvenues.updated_at current on every change
+-- The API notices venue edits through count(*) and max(updated_at) of this
+-- table. Edits made outside the API (admin panel, SQL console) left
+-- updated_at untouched, so the cached catalog kept serving the old row.
+
+ALTER TABLE public.adminvenues
+  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE;
+UPDATE public.adminvenues SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE public.adminvenues ALTER COLUMN updated_at SET DEFAULT TIMEZONE('utc', NOW());
+
+DROP TRIGGER IF EXISTS update_adminvenues_updated_at ON public.adminvenues;
+CREATE TRIGGER update_adminvenues_updated_at
+  BEFORE UPDATE ON public.adminvenues
+  FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
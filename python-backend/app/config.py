@@ -1,23 +1,166 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional, Tuple
 import json
+import os
 
 class Settings(BaseSettings):
     # Server Configuration
     PORT: int = 5000
     HOST: str = "0.0.0.0"
+    ENVIRONMENT: str = "development"  # "development" runs one auto-reloading process
+    WEB_CONCURRENCY: int = 0  # worker processes; 0 = one per CPU core in production (needs the redis stores)
+    MAX_REQUESTS_PER_WORKER: int = 10000  # recycle a worker after this many requests (0 = never)
+    MAX_REQUESTS_JITTER: int = 1000  # so workers do not all restart at once
+    GRACEFUL_TIMEOUT_SECONDS: int = 30  # time in-flight requests get to finish on SIGTERM
+    TRUSTED_PROXY_IPS: str = "127.0.0.1"  # comma-separated proxies whose X-Forwarded-For is believed
     
     # Database Configuration
     DATABASE_URL: str
+    DB_CONNECTION_BUDGET: int = 30  # Postgres connections all workers on this host may hold together
+    DB_POOL_MODE: str = "direct"  # "direct", or "pgbouncer" behind a transaction-mode pooler
+    DB_PGBOUNCER_POOL_SIZE: int = 0  # local connections kept per worker in pgbouncer mode (0 = none)
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # reopen connections older than this; keep below the pooler's idle timeout
+    DB_LIVENESS_CHECK_SECONDS: float = 30  # ping idle pooled connections this often (0 disables)
+    
+    # Read Replica Configuration
+    DATABASE_REPLICA_URL: Optional[str] = None  # read-only routes use it when set
+    REPLICA_MAX_LAG_SECONDS: float = 5  # reads fall back to the primary beyond this
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 5
+    READ_YOUR_WRITES_SECONDS: float = 15  # a user's reads stay on the primary this long after they write
     
     # JWT Configuration
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
+    JWT_BACKEND: str = "jose"  # "jose" or "pyjwt"
+    TOKEN_CACHE_SIZE: int = 10000  # verified tokens remembered per worker
+    TOKEN_CACHE_TTL_SECONDS: int = 300  # never beyond the token's own exp
+    # Accept tokens whose subject is an email or phone number, as issued before
+    # subjects became user ids. Turn off (and delete the fallback) once
+    # ACCESS_TOKEN_EXPIRE_MINUTES have passed since that change was deployed.
+    ACCEPT_LEGACY_TOKEN_SUBJECTS: bool = True
+    
+    # Password Hashing Configuration
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt threads per worker process
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # waiting jobs before answering 503
+    
+    # Authenticated User Cache Configuration
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    
+    # Availability Index Configuration
+    AVAILABILITY_TTL_SECONDS: int = 30  # reload a venue/day from the DB after this
+    AVAILABILITY_MAX_DAYS: int = 5000  # venue/day entries kept in memory
+    
+    # Booking times are wall-clock times at the venue
+    BOOKING_TIMEZONE: str = "Asia/Kolkata"
+    
+    # Lookup Cache Configuration (cities, game types)
+    LOOKUP_CACHE_TTL_SECONDS: int = 3600
+    
+    # Venue Catalog Cache Configuration
+    VENUE_CATALOG_CHECK_SECONDS: int = 30  # how often to look for changed venues
+    VENUE_CATALOG_MAX_AGE_SECONDS: int = 600  # full reload even if nothing seems changed; 0 to disable
+    
+    # OTP Configuration
+    OTP_TTL_MINUTES: int = 10
+    OTP_MAX_ATTEMPTS: int = 3
+    OTP_STORE_BACKEND: str = "memory"  # "memory" (single worker only) or "redis"
+    OTP_STORE_MAX_SIZE: int = 100000  # pending codes kept by the memory store
+    REDIS_URL: Optional[str] = None
+    OTP_PHONE_BURST: int = 3  # codes a phone number can request back to back
+    OTP_PHONE_REFILL_PER_MINUTE: float = 1
+    OTP_IP_BURST: int = 20  # OTP requests (send or verify) per client IP
+    OTP_IP_REFILL_PER_MINUTE: float = 10
+    OTP_AUDIT_ENABLED: bool = True  # record OTP history in otp_verifications
+    OTP_RETENTION_HOURS: float = 24  # keep audit rows this long after they expire
+    OTP_SWEEP_INTERVAL_SECONDS: float = 300  # 0 disables the sweeper
+    OTP_SWEEP_BATCH_SIZE: int = 1000
+    
+    # Observability Configuration
+    SERVER_TIMING_ENABLED: bool = True  # send db/app timings in a Server-Timing header
+    QUERY_DIAGNOSTICS_ENABLED: bool = False  # slow-query log and N+1 detection
+    SLOW_QUERY_MS: float = 200
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1  # share of slow SELECTs that get an EXPLAIN
+    N_PLUS_ONE_THRESHOLD: int = 5  # same statement shape this often in one request
+    DIAGNOSTICS_BUFFER_SIZE: int = 500
+    ADMIN_API_KEY: Optional[str] = None  # X-Admin-Key for /api/v1/admin; admin routes are off when unset
+    
+    # Idempotency Configuration
+    IDEMPOTENCY_TTL_SECONDS: float = 24 * 3600  # how long a retry with the same Idempotency-Key is replayed
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_WAIT_SECONDS: float = 10  # a retry waits this long for the original request to finish
+    IDEMPOTENCY_STORE_BACKEND: str = "memory"  # "memory" (single worker only) or "redis" (uses REDIS_URL)
+    
+    # Compression Configuration
+    COMPRESSION_ENABLED: bool = True  # gzip/brotli per Accept-Encoding
+    COMPRESSION_MIN_SIZE: int = 1024  # smaller bodies are sent as they are
+    GZIP_LEVEL: int = 4  # 1-9; list routes use more, see main.py
+    BROTLI_QUALITY: int = 3  # 0-11; higher is smaller but much slower
     
     # CORS Configuration
     CORS_ORIGINS: str = '["*"]'
     
+    @property
+    def is_development(self) -> bool:
+        return self.ENVIRONMENT.lower() in ("development", "dev", "local")
+    
+    @property
+    def shares_state_between_workers(self) -> bool:
+        """Whether pending OTP codes and idempotency keys (and so recent writes) are visible to every worker"""
+        return self.OTP_STORE_BACKEND == "redis" and self.IDEMPOTENCY_STORE_BACKEND == "redis"
+    
+    @property
+    def worker_count(self) -> int:
+        """Worker processes the server runs.
+        
+        The default is one per CPU core in production, but never more than
+        DB_CONNECTION_BUDGET, and only one while OTP codes or idempotency keys
+        are kept in process memory.
+        """
+        if self.WEB_CONCURRENCY > 0:
+            return self.WEB_CONCURRENCY
+        if self.is_development or not self.shares_state_between_workers:
+            return 1
+        return max(1, min(os.cpu_count() or 1, self.DB_CONNECTION_BUDGET))
+    
+    @model_validator(mode="after")
+    def check_worker_count(self) -> "Settings":
+        """Refuse a WEB_CONCURRENCY the other settings cannot support"""
+        if self.worker_count > 1 and not self.shares_state_between_workers:
+            raise ValueError(
+                f"WEB_CONCURRENCY={self.WEB_CONCURRENCY} needs OTP_STORE_BACKEND=redis and "
+                "IDEMPOTENCY_STORE_BACKEND=redis: with in-memory stores an OTP sent by one worker "
+                "cannot be verified by another, and a retried booking would run twice"
+            )
+        if self.worker_count > self.DB_CONNECTION_BUDGET:
+            raise ValueError(
+                f"WEB_CONCURRENCY={self.WEB_CONCURRENCY} is more than DB_CONNECTION_BUDGET="
+                f"{self.DB_CONNECTION_BUDGET}; every worker needs at least one connection"
+            )
+        return self
+    
+    @property
+    def db_pool_limits(self) -> Tuple[int, int]:
+        """(pool_size, max_overflow) for one worker's API engine.
+        
+        Each worker gets an equal share of DB_CONNECTION_BUDGET; a third of
+        it is kept open, the rest is overflow opened under load.
+        """
+        per_worker = self.DB_CONNECTION_BUDGET // self.worker_count
+        pool_size = max(1, -(-per_worker // 3))
+        return pool_size, per_worker - pool_size
+    
+    @property
+    def trusted_proxy_ips(self) -> List[str]:
+        """Parse TRUSTED_PROXY_IPS string to list"""
+        return [ip.strip() for ip in self.TRUSTED_PROXY_IPS.split(",") if ip.strip()]
+    
+    @property
+    def uses_external_pooler(self) -> bool:
+        return self.DB_POOL_MODE.lower() == "pgbouncer"
+    
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS_ORIGINS string to list"""
@@ -1,39 +1,174 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .diagnostics import QueryDiagnostics
+from .instrumentation import TimedAsyncQueuePool, TimedNullPool, TimedQueuePool, instrument_engine
+from uuid import uuid4
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    echo=False  # Set to True for SQL query logging
+def get_async_database_url(database_url: str) -> str:
+    """Convert a sync PostgreSQL URL into its asyncpg equivalent"""
+    url = make_url(database_url)
+    query = dict(url.query)
+    # asyncpg does not understand libpq's sslmode, it takes ssl instead
+    sslmode = query.pop("sslmode", None)
+    if sslmode and "ssl" not in query:
+        query["ssl"] = sslmode
+    return url.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+
+
+def async_engine_options() -> dict:
+    """Pool and driver options for the API engines, per DB_POOL_MODE.
+    
+    Connections are not pinged on every checkout; they are reopened after
+    DB_POOL_RECYCLE_SECONDS and idle ones are checked in the background
+    (see utils/db_liveness.py).
+    """
+    pool_size, max_overflow = settings.db_pool_limits
+    if not settings.uses_external_pooler:
+        return {
+            "poolclass": TimedAsyncQueuePool,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS
+        }
+    
+    # A transaction-mode pooler may run each transaction on a different server
+    # connection, so no prepared statement can outlive its transaction: turn
+    # off asyncpg's statement cache and give every statement a unique name.
+    options = {
+        "connect_args": {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__"
+        }
+    }
+    if settings.DB_PGBOUNCER_POOL_SIZE > 0:
+        # A few connections to the pooler kept open to save the connect time
+        options.update(
+            poolclass=TimedAsyncQueuePool,
+            pool_size=settings.DB_PGBOUNCER_POOL_SIZE,
+            max_overflow=max(pool_size + max_overflow - settings.DB_PGBOUNCER_POOL_SIZE, 0),
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS
+        )
+    else:
+        options["poolclass"] = TimedNullPool
+    return options
+
+# Create async engine (used by the API routes), sized to this worker's
+# share of DB_CONNECTION_BUDGET
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    echo=False,
+    **async_engine_options()
+)
+
+# Optional read replica for read-only routes (see utils/read_routing.py). It
+# is a separate server, so it gets its own pool of the same size.
+replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        get_async_database_url(settings.DATABASE_REPLICA_URL),
+        echo=False,
+        **async_engine_options()
+    )
+
+# Count and time every query for the metrics endpoint and Server-Timing
+instrument_engine(async_engine.sync_engine)
+if replica_engine is not None:
+    instrument_engine(replica_engine.sync_engine)
+
+# Slow-query log and N+1 detection for the API engine (diagnostic mode)
+query_diagnostics = QueryDiagnostics(
+    slow_query_ms=settings.SLOW_QUERY_MS,
+    explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+    buffer_size=settings.DIAGNOSTICS_BUFFER_SIZE
 )
+if settings.QUERY_DIAGNOSTICS_ENABLED:
+    query_diagnostics.install(async_engine)
+    if replica_engine is not None:
+        query_diagnostics.watch(replica_engine)
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create AsyncSessionLocal class
+# expire_on_commit=False so ORM objects stay readable after commit without
+# triggering implicit (blocking) refresh queries
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+ReplicaSessionLocal = None
+if replica_engine is not None:
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
 
 # Create Base class for models
 Base = declarative_base()
 
+# The sync engine is only used by scripts, so it (and psycopg2) is created on
+# first use rather than whenever the API imports this module
+_sync_engine = None
+_sync_sessionmaker = None
+
+def get_sync_engine():
+    """SQLAlchemy engine for scripts; the API never opens it"""
+    global _sync_engine
+    if _sync_engine is None:
+        _sync_engine = create_engine(
+            settings.DATABASE_URL,
+            poolclass=TimedQueuePool,
+            pool_pre_ping=True,
+            pool_size=2,
+            max_overflow=3,
+            echo=False  # Set to True for SQL query logging
+        )
+        instrument_engine(_sync_engine)
+    return _sync_engine
+
+def get_sync_sessionmaker():
+    global _sync_sessionmaker
+    if _sync_sessionmaker is None:
+        _sync_sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=get_sync_engine())
+    return _sync_sessionmaker
+
+def __getattr__(name):
+    # Keeps `from app.database import engine, SessionLocal` working
+    if name == "engine":
+        return get_sync_engine()
+    if name == "SessionLocal":
+        return get_sync_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Dependency to get DB session
 def get_db():
-    db = SessionLocal()
+    db = get_sync_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
 
-def test_connection():
+# Dependency to get async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def test_connection():
     """Test database connection"""
     try:
-        with engine.connect() as connection:
-            result = connection.execute(text("SELECT NOW()"))
+        async with async_engine.connect() as connection:
+            result = await connection.execute(text("SELECT NOW()"))
             server_time = result.fetchone()[0]
             logger.info("✅ PostgreSQL Connected Successfully")
             logger.info(f"   Database: MYRUSH")
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import random
+import re
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from .instrumentation import RequestStats, current_request, request_finished_hooks
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"\$\d+(?:::\w+(?: (?:WITH|WITHOUT) TIME ZONE| VARYING)?(?:\[\])?)?|%\(\w+\)s|%s")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\?(?:, \?)+\)")
+
+def normalize_sql(statement: str) -> str:
+    """Reduce a statement to its shape: literals and bind markers become ?, IN lists collapse"""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _LIST.sub("(?, ...)", sql)
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Types of the bound parameters, never their values"""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return {"rows": len(parameters), "each": parameter_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+class QueryDiagnostics:
+    """Slow-query log and N+1 detector, kept in a bounded ring buffer.
+
+    Statements slower than slow_query_ms are recorded with their normalized
+    SQL, parameter types and route; a sample of them also gets an EXPLAIN
+    plan, fetched afterwards on a separate connection. Requests that run the
+    same statement shape n_plus_one_threshold times or more are flagged.
+    """
+
+    def __init__(self, slow_query_ms: float, explain_sample_rate: float, n_plus_one_threshold: int, buffer_size: int):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._explain_engine: Optional[AsyncEngine] = None
+        # The event loop only keeps weak references to tasks
+        self._explain_tasks: Set[asyncio.Task] = set()
+
+    def install(self, engine: AsyncEngine) -> None:
+        """Watch every statement run through engine; EXPLAIN plans are fetched with it too"""
+        self._explain_engine = engine
+        self.watch(engine)
+        request_finished_hooks.append(self._request_finished)
+
+    def watch(self, engine: AsyncEngine) -> None:
+        """Also watch statements run through another engine, e.g. a read replica"""
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _record(self, kind: str, **details: Any) -> Dict[str, Any]:
+        entry = {"kind": kind, "at": datetime.now(timezone.utc).isoformat(), **details}
+        self.events.append(entry)
+        return entry
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("EXPLAIN"):
+            return
+        elapsed = getattr(context, "_query_elapsed", 0.0)
+        stats = current_request.get()
+        shape = None
+        if stats is not None:
+            shape = normalize_sql(statement)
+            if stats.query_shapes is None:
+                stats.query_shapes = {}
+            counts = stats.query_shapes.setdefault(shape, [0, 0.0])
+            counts[0] += 1
+            counts[1] += elapsed
+
+        if elapsed < self.slow_query_seconds:
+            return
+        route = stats.route if stats else "background"
+        entry = self._record(
+            "slow_query",
+            route=route,
+            duration_ms=round(elapsed * 1000, 2),
+            sql=shape or normalize_sql(statement),
+            parameters=parameter_shape(parameters, executemany),
+            plan=None
+        )
+        logger.warning(f"Slow query ({entry['duration_ms']} ms) on {route}: {entry['sql']}")
+        if (
+            not executemany
+            and statement.lstrip().upper().startswith("SELECT")
+            and random.random() < self.explain_sample_rate
+        ):
+            try:
+                task = asyncio.get_running_loop().create_task(self._explain(entry, statement, parameters))
+            except RuntimeError:
+                return  # sync engine outside the event loop, e.g. a script
+            self._explain_tasks.add(task)
+            task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(self, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        # Runs after the request's own transaction, on its own connection,
+        # so a failing EXPLAIN can never abort the caller's transaction
+        current_request.set(None)
+        try:
+            async with self._explain_engine.connect() as connection:
+                result = await connection.exec_driver_sql("EXPLAIN " + statement, parameters)
+                entry["plan"] = [row[0] for row in result]
+        except Exception as e:
+            entry["plan"] = [f"EXPLAIN failed: {e}"]
+
+    def _request_finished(self, stats: RequestStats) -> None:
+        if not stats.query_shapes:
+            return
+        for shape, (count, seconds) in stats.query_shapes.items():
+            if count >= self.n_plus_one_threshold:
+                self._record(
+                    "n_plus_one",
+                    route=stats.route,
+                    sql=shape,
+                    count=count,
+                    total_ms=round(seconds * 1000, 2)
+                )
+                logger.warning(f"Possible N+1 on {stats.route}: {count} x {shape}")
+
+    def snapshot(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recorded events, newest first"""
+        return [dict(entry) for entry in reversed(self.events) if kind is None or entry["kind"] == kind]
+
+    def clear(self) -> None:
+        self.events.clear()
@@ -0,0 +1,205 @@
+import time
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+from .metrics import Counter, Gauge, Histogram
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request, including sending the response",
+    ["method", "route", "status"]
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled"
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing a single SQL statement",
+    ["route"]
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling one request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+db_pool_checkout = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent getting a connection from the pool, including waiting for a free one"
+)
+db_pool_timeouts = Counter(
+    "db_pool_timeouts_total",
+    "Connection checkouts that gave up after the pool timeout"
+)
+db_pool_connections = Gauge(
+    "db_pool_connections",
+    "Pooled database connections by state",
+    ["state"]
+)
+
+def route_name(scope) -> str:
+    """Path template of the route that handled the request, e.g. /api/v1/venues/{venue_id}"""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+class RequestStats:
+    """Database work done on behalf of the current request"""
+
+    __slots__ = ("scope", "started", "db_queries", "db_seconds", "query_shapes")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        # normalized SQL -> [count, seconds], filled in by query diagnostics
+        self.query_shapes = None
+
+    @property
+    def route(self) -> str:
+        # The router records the matched route on the scope before calling the endpoint
+        return route_name(self.scope)
+
+# Shared with the SQLAlchemy greenlets that run a request's queries
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+# Called with each request's stats once the response has been sent
+request_finished_hooks: List[Callable[[RequestStats], None]] = []
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = context._query_elapsed = time.perf_counter() - context._query_started
+    stats = current_request.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+    db_query_duration.observe(elapsed, route=stats.route if stats else "background")
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement run through engine (pass async_engine.sync_engine for async engines)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+class TimedPoolMixin:
+    """Records how long each connection checkout takes.
+
+    Besides the process-wide histogram each pool keeps its own totals, so
+    pool_stats() can report them per engine.
+    """
+
+    checkouts = 0
+    timeouts = 0
+    wait_seconds_total = 0.0
+    wait_seconds_max = 0.0
+    in_use = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            db_pool_timeouts.inc()
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            db_pool_checkout.observe(waited)
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.in_use += 1
+        return connection
+
+    def _do_return_conn(self, record):
+        self.in_use = max(self.in_use - 1, 0)
+        super()._do_return_conn(record)
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+class TimedNullPool(TimedPoolMixin, NullPool):
+    """Opens a connection per checkout, for use behind an external pooler"""
+
+def observe_pool(pool: Pool) -> None:
+    """Copy a pool's current occupancy into the pool gauges"""
+    stats = pool_stats(pool)
+    db_pool_connections.set(stats["checked_out"], state="checked_out")
+    db_pool_connections.set(stats["idle"], state="idle")
+    db_pool_connections.set(stats["overflow"], state="overflow")
+
+def pool_stats(pool: Pool) -> dict:
+    """Occupancy and checkout wait times of one engine's pool"""
+    if isinstance(pool, QueuePool):
+        size, checked_out, idle, overflow = pool.size(), pool.checkedout(), pool.checkedin(), max(pool.overflow(), 0)
+    else:
+        # NullPool keeps nothing open between checkouts
+        size, checked_out, idle, overflow = 0, getattr(pool, "in_use", 0), 0, 0
+    checkouts = getattr(pool, "checkouts", 0)
+    wait_total = getattr(pool, "wait_seconds_total", 0.0)
+    return {
+        "pool": type(pool).__name__,
+        "size": size,
+        "checked_out": checked_out,
+        "idle": idle,
+        "overflow": overflow,
+        "checkouts": checkouts,
+        "timeouts": getattr(pool, "timeouts", 0),
+        "wait_ms_avg": round(wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+        "wait_ms_max": round(getattr(pool, "wait_seconds_max", 0.0) * 1000, 3)
+    }
+
+class MetricsMiddleware:
+    """Records latency, status and DB usage per route, and adds a Server-Timing header.
+
+    Written as plain ASGI middleware so it adds no extra task or response
+    buffering to each request.
+    """
+
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    total_ms = (time.perf_counter() - stats.started) * 1000
+                    db_ms = stats.db_seconds * 1000
+                    header = (
+                        f'db;dur={db_ms:.1f};desc="queries={stats.db_queries}", '
+                        f"app;dur={max(total_ms - db_ms, 0.0):.1f}, total;dur={total_ms:.1f}"
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            current_request.reset(token)
+            elapsed = time.perf_counter() - stats.started
+            route = stats.route
+            http_request_duration.observe(elapsed, method=scope["method"], route=route, status=str(status_code))
+            db_queries_per_request.observe(stats.db_queries, route=route)
+            for hook in request_finished_hooks:
+                hook(stats)
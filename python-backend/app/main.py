@@ -1,8 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from .config import settings
-from .database import test_connection
-from .routes import auth_router, profile_router, venue_router, booking_router, otp_router, common_router
+from .database import async_engine, replica_engine
+from .instrumentation import MetricsMiddleware, observe_pool
+from .metrics import registry
+from .utils.availability import availability_index
+from .utils.cache_invalidation import cache_invalidator
+from .utils.compression import CompressionLevels, CompressionMiddleware
+from .utils.db_liveness import liveness_checker
+from .utils.hashing import hashing_pool
+from .utils.otp_audit import otp_audit_log
+from .utils.otp_sweeper import otp_sweeper
+from .utils.pricing import price_book
+from .utils.read_routing import read_router
+from .utils.responses import FastJSONResponse
+from .utils.venue_catalog import venue_catalog
+from .utils.warmup import warmup
+from .routes import auth_router, profile_router, venue_router, booking_router, otp_router, common_router, admin_router
+from .routes.common import cities_cache, game_types_cache, invalidate_lookup_caches
 import logging
 
 # Configure logging
@@ -18,9 +34,19 @@ app = FastAPI(
     description="MyRush Backend API Server",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=FastJSONResponse
 )
 
+# Venue and booking lists are the large responses mobile clients wait on, so
+# they get the levels past which output barely shrinks (gzip 6, brotli 4)
+# while everything else is compressed at the cheaper defaults
+ROUTE_COMPRESSION_LEVELS = {
+    "/api/v1/venues/": CompressionLevels(gzip=6, brotli=4),
+    "/api/v1/venues/nearby": CompressionLevels(gzip=6, brotli=4),
+    "/api/v1/bookings/my-bookings": CompressionLevels(gzip=6, brotli=4),
+}
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +56,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli per Accept-Encoding; cached bodies arrive already compressed
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        levels=CompressionLevels(gzip=settings.GZIP_LEVEL, brotli=settings.BROTLI_QUALITY),
+        route_levels=ROUTE_COMPRESSION_LEVELS
+    )
+
+# Added last so it wraps everything else and times the whole request
+app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(profile_router)
@@ -37,6 +75,20 @@ app.include_router(venue_router)
 app.include_router(booking_router)
 app.include_router(otp_router)
 app.include_router(common_router)
+app.include_router(admin_router)
+
+# Loaded before the worker reports ready, so the first requests hit warm caches
+warmup.add("venue_catalog", venue_catalog.ensure_fresh)
+warmup.add("price_rules", price_book.ensure_fresh)
+warmup.add("cities", cities_cache.get)
+warmup.add("game_types", game_types_cache.get)
+
+# Dropped through POST /api/v1/admin/caches/invalidate after edits made
+# outside the API (admin app, SQL console)
+cache_invalidator.add("lookups", invalidate_lookup_caches)
+cache_invalidator.add("venues", venue_catalog.invalidate)
+cache_invalidator.add("prices", price_book.invalidate)
+cache_invalidator.add("availability", availability_index.invalidate)
 
 @app.on_event("startup")
 async def startup_event():
@@ -45,14 +97,16 @@ async def startup_event():
     logger.info("🚀 MyRush API Server Starting...")
     logger.info("=" * 60)
     
-    # Test database connection
-    if test_connection():
-        logger.info("✅ Database connection successful")
-    else:
-        logger.error("❌ Database connection failed")
-        raise Exception("Failed to connect to database")
+    # Connects to the database and fills caches in the background, so the
+    # server starts listening straight away; /health/ready reports when done
+    warmup.start()
+    otp_audit_log.start()
+    otp_sweeper.start()
+    read_router.start()
+    liveness_checker.start()
+    cache_invalidator.start()
     
-    logger.info(f"📝 Environment: development")
+    logger.info(f"📝 Environment: {settings.ENVIRONMENT}")
     logger.info(f"🌐 Port: {settings.PORT}")
     logger.info(f"📚 API Docs: http://localhost:{settings.PORT}/api/docs")
     logger.info("=" * 60)
@@ -61,6 +115,16 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info("👋 Shutting down MyRush API Server...")
+    await warmup.stop()
+    await cache_invalidator.stop()
+    await liveness_checker.stop()
+    await read_router.stop()
+    await otp_sweeper.stop()
+    await otp_audit_log.stop()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+    hashing_pool.shutdown()
 
 @app.get("/")
 async def root():
@@ -78,3 +142,23 @@ async def health_check():
         "status": "healthy",
         "database": "connected"
     }
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the worker process is up and its event loop is responsive"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: warm-up has finished and the database is reachable"""
+    if not warmup.ready:
+        return FastJSONResponse(status_code=503, content={"status": "starting"})
+    if not liveness_checker.up.get("primary", True):
+        return FastJSONResponse(status_code=503, content={"status": "unavailable", "database": "unreachable"})
+    return {"status": "ready"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker process"""
+    observe_pool(async_engine.pool)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,7 +1,7 @@
 from .user import User, Profile
-from .venue import Venue
+from .venue import Venue, VenuePriceRule
 from .booking import Booking
 from .otp import OTPVerification
 from .common import City, GameType
 
-__all__ = ["User", "Profile", "Venue", "Booking", "OTPVerification", "City", "GameType"]
+__all__ = ["User", "Profile", "Venue", "VenuePriceRule", "Booking", "OTPVerification", "City", "GameType"]
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, Numeric, Date, Time, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, Numeric, Date, Time, ForeignKey, text
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
 from datetime import datetime
 import uuid
 from ..database import Base
 
+BOOKING_OVERLAP_CONSTRAINT = "booking_no_overlap"
+
 class Booking(Base):
     __tablename__ = "booking"
     
@@ -31,3 +33,18 @@ class Booking(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Active bookings of a venue may not overlap (010_add_booking_overlap_constraint.sql)
+    __table_args__ = (
+        ExcludeConstraint(
+            (venue_id, '='),
+            (text(
+                "tsrange(booking_date + start_time, "
+                "booking_date + end_time + CASE WHEN end_time <= start_time THEN INTERVAL '1 day' ELSE INTERVAL '0' END, "
+                "'[)')"
+            ), '&&'),
+            name=BOOKING_OVERLAP_CONSTRAINT,
+            using='gist',
+            where=text("status NOT IN ('cancelled', 'refunded')")
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -19,3 +19,13 @@ class OTPVerification(Base):
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Unverified rows per phone, newest first (matches migration 013)
+        Index(
+            "idx_otp_pending_phone_created",
+            "phone_number",
+            created_at.desc(),
+            postgresql_where=(is_verified == False)
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ARRAY, Text, Numeric
+from sqlalchemy import Column, String, Integer, SmallInteger, DateTime, Boolean, ARRAY, Text, Numeric, Time, ForeignKey, Float
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -15,5 +15,21 @@ class Venue(Base):
     description = Column(Text, nullable=True)
     photos = Column(ARRAY(String), nullable=True)
     videos = Column(ARRAY(String), nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class VenuePriceRule(Base):
+    __tablename__ = "venue_price_rules"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    venue_id = Column(UUID(as_uuid=True), ForeignKey("adminvenues.id", ondelete="CASCADE"), nullable=False, index=True)
+    day_of_week = Column(SmallInteger, nullable=True)  # 0 = Monday, NULL = every day
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)  # at or before start_time: runs past midnight
+    price_per_hour = Column(Numeric(10, 2), nullable=False)
+    is_peak = Column(Boolean, nullable=False, default=False)
+    priority = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -4,5 +4,6 @@ from .venue import router as venue_router
 from .booking import router as booking_router
 from .otp import router as otp_router
 from .common import router as common_router
+from .admin import router as admin_router
 
-__all__ = ["auth_router", "profile_router", "venue_router", "booking_router", "otp_router", "common_router"]
+__all__ = ["auth_router", "profile_router", "venue_router", "booking_router", "otp_router", "common_router", "admin_router"]
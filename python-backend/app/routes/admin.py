@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from typing import List, Optional
+import hmac
+from ..config import settings
+from ..database import async_engine, query_diagnostics, replica_engine
+from ..instrumentation import pool_stats
+from ..utils.cache_invalidation import cache_invalidator
+from ..utils.responses import envelope
+
+router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
+
+def require_admin_key(x_admin_key: Optional[str] = Header(None)):
+    """Allow the request only with the configured X-Admin-Key"""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin key"
+        )
+
+@router.get("/diagnostics/queries", dependencies=[Depends(require_admin_key)])
+async def get_query_diagnostics(kind: Optional[str] = Query(None, pattern="^(slow_query|n_plus_one)$")):
+    """Recent slow queries and N+1 patterns, newest first"""
+    return envelope({
+        "enabled": settings.QUERY_DIAGNOSTICS_ENABLED,
+        "slow_query_ms": settings.SLOW_QUERY_MS,
+        "n_plus_one_threshold": settings.N_PLUS_ONE_THRESHOLD,
+        "events": query_diagnostics.snapshot(kind)
+    })
+
+@router.delete("/diagnostics/queries", dependencies=[Depends(require_admin_key)])
+async def clear_query_diagnostics():
+    """Empty the diagnostics buffer"""
+    query_diagnostics.clear()
+    return envelope(None, message="Diagnostics cleared")
+
+@router.get("/diagnostics/pool", dependencies=[Depends(require_admin_key)])
+async def get_pool_diagnostics():
+    """Connection pool occupancy and checkout wait times for this worker"""
+    pools = {"primary": pool_stats(async_engine.pool)}
+    if replica_engine is not None:
+        pools["replica"] = pool_stats(replica_engine.pool)
+    return envelope({
+        "mode": settings.DB_POOL_MODE,
+        "pools": pools
+    })
+
+@router.post("/caches/invalidate", dependencies=[Depends(require_admin_key)])
+async def invalidate_caches(cache: Optional[List[str]] = Query(None)):
+    """Drop in-memory caches in every worker (repeat cache for several, default all)"""
+    names = cache or cache_invalidator.names
+    unknown = [name for name in names if name not in cache_invalidator.names]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown cache {', '.join(unknown)}; expected some of {', '.join(cache_invalidator.names)}"
+        )
+    all_workers = await cache_invalidator.invalidate(names)
+    return envelope({
+        "caches": names,
+        "all_workers": all_workers
+    }, message="Caches invalidated")
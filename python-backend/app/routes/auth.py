@@ -1,20 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
 from ..models.user import User
-from ..schemas.user import UserRegister, UserLogin, AuthResponse, UserResponse
-from ..utils.auth import get_password_hash, verify_password, create_access_token, get_current_user
+from ..schemas.user import UserRegister, UserLogin, AuthResponse, UserResponse, UserPrincipal
+from ..utils.auth import get_password_hash_async, verify_password_async, create_access_token, get_current_user, invalidate_user_cache
+from ..utils.read_routing import read_router
 import uuid
 from datetime import datetime
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
 
 @router.post("/register", response_model=AuthResponse)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     try:
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
+        result = await db.execute(select(User).where(User.email == user_data.email))
+        existing_user = result.scalars().first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -26,7 +29,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         new_user = User(
             id=user_id,
             email=user_data.email,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=await get_password_hash_async(user_data.password),
             first_name=user_data.first_name,
             last_name=user_data.last_name,
             full_name=f"{user_data.first_name} {user_data.last_name}",
@@ -37,11 +40,12 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
+        await read_router.mark_write(new_user)
         
         # Create access token
-        access_token = create_access_token(data={"sub": new_user.email})
+        access_token = create_access_token(data={"sub": str(new_user.id)})
         
         return {
             "success": True,
@@ -60,18 +64,19 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error registering user: {str(e)}"
         )
 
 @router.post("/login", response_model=AuthResponse)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user"""
     try:
         # Find user by email
-        user = db.query(User).filter(User.email == credentials.email).first()
+        result = await db.execute(select(User).where(User.email == credentials.email))
+        user = result.scalars().first()
         
         if not user or not user.password_hash:
              # Fallback or error if password_hash is missing (e.g. social login users)
@@ -80,7 +85,7 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
                 detail="Invalid email or password"
             )
 
-        if not verify_password(credentials.password, user.password_hash):
+        if not await verify_password_async(credentials.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
@@ -94,10 +99,11 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
         
         # Update last login
         user.last_login_at = datetime.utcnow()
-        db.commit()
+        await db.commit()
+        invalidate_user_cache(user)
         
         # Create access token
-        access_token = create_access_token(data={"sub": user.email})
+        access_token = create_access_token(data={"sub": str(user.id)})
         
         return {
             "success": True,
@@ -122,7 +128,7 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
         )
 
 @router.get("/profile", response_model=AuthResponse)
-async def get_profile(current_user: User = Depends(get_current_user)):
+async def get_profile(current_user: UserPrincipal = Depends(get_current_user)):
     """Get current user profile"""
     try:
         return {
@@ -1,27 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, time, timedelta
-from ..database import get_db
-from ..models.booking import Booking
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, text, tuple_, or_, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from ..config import settings
+from ..database import get_async_db
+from ..models.booking import Booking, BOOKING_OVERLAP_CONSTRAINT
 from ..models.venue import Venue
 from ..models.user import User
-from ..schemas.booking import BookingCreate, BookingResponse
+from ..schemas.booking import (
+    BookingCreate, BookingResponse, BookingSummary, BookingStatusResponse,
+    BookingBulkCreate, BulkBookingResult, BulkSlotResult
+)
+from ..schemas.common import Envelope, PageEnvelope
+from ..schemas.user import UserPrincipal
 from ..utils.auth import get_current_user
+from ..utils.availability import INACTIVE_STATUSES, availability_index
+from ..utils.idempotency import IdempotentRoute
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils.pricing import price_book
+from ..utils.read_routing import get_read_db, read_router
+from ..utils.responses import envelope
+from ..utils.venue_catalog import venue_catalog
 import uuid
 
-router = APIRouter(prefix="/api/v1/bookings", tags=["Bookings"])
+router = APIRouter(prefix="/api/v1/bookings", tags=["Bookings"], route_class=IdempotentRoute)
 
-@router.post("/", response_model=dict)
+# SQLSTATE raised by PostgreSQL when an exclusion constraint rejects a row
+EXCLUSION_VIOLATION = "23P01"
+
+def is_overlap_violation(error: IntegrityError) -> bool:
+    """Check whether an IntegrityError came from the booking overlap constraint"""
+    return (
+        getattr(error.orig, "pgcode", None) == EXCLUSION_VIOLATION
+        or BOOKING_OVERLAP_CONSTRAINT in str(error.orig)
+    )
+
+@router.post("/", response_model=Envelope[BookingResponse])
 async def create_booking(
     booking_data: BookingCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new booking"""
     try:
         # Check if venue exists
-        venue = db.query(Venue).filter(Venue.id == booking_data.venue_id).first()
+        await venue_catalog.ensure_fresh(db)
+        venue = venue_catalog.get(booking_data.venue_id)
         if not venue:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -33,32 +61,15 @@ async def create_booking(
         end_datetime = start_datetime + timedelta(minutes=booking_data.duration_minutes)
         end_time = end_datetime.time()
         
-        # Check for conflicts
-        # This is a simplified check. In production, you'd want more robust overlap checking
-        # considering date and time ranges.
-        existing_booking = db.query(Booking).filter(
-            Booking.venue_id == booking_data.venue_id,
-            Booking.booking_date == booking_data.booking_date,
-            Booking.status != 'cancelled',
-            Booking.status != 'refunded',
-            Booking.start_time < end_time,
-            Booking.end_time > booking_data.start_time
-        ).first()
-        
-        if existing_booking:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This time slot is already booked"
-            )
-        
-        # Calculate price (simplified logic, assuming price is in venue.prices as string or default)
-        try:
-            price_per_hour = float(venue.prices) if venue.prices and venue.prices.replace('.', '', 1).isdigit() else 800.00
-        except:
-            price_per_hour = 800.00
-            
-        total_amount = price_per_hour * (booking_data.duration_minutes / 60.0)
+        # No availability pre-check: the booking_no_overlap constraint rejects
+        # a taken slot on insert, while the cached index may still show a
+        # slot cancelled elsewhere (another worker, the admin app) as taken
         
+        await price_book.ensure_fresh(db)
+        quote = price_book.table_for(venue).quote(
+            booking_data.booking_date, booking_data.start_time, booking_data.duration_minutes
+        )
+
         # Create booking
         new_booking = Booking(
             id=uuid.uuid4(),
@@ -71,47 +82,291 @@ async def create_booking(
             number_of_players=booking_data.number_of_players,
             team_name=booking_data.team_name,
             special_requests=booking_data.special_requests,
-            price_per_hour=price_per_hour,
-            total_amount=total_amount,
+            price_per_hour=quote.price_per_hour,
+            total_amount=quote.total_amount,
             status='pending',
             payment_status='pending'
         )
         
         db.add(new_booking)
-        db.commit()
-        db.refresh(new_booking)
-        
-        return {
-            "success": True,
-            "message": "Booking created successfully",
-            "data": new_booking
-        }
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if not is_overlap_violation(e):
+                raise
+            # Someone else holds the slot; our cached view of that day is stale
+            availability_index.invalidate(booking_data.venue_id, booking_data.booking_date)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This time slot is already booked"
+            )
+        await db.refresh(new_booking)
+        availability_index.add_booking(new_booking)
+        await read_router.mark_write(current_user)
+        
+        return envelope(BookingResponse.model_validate(new_booking), message="Booking created successfully")
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating booking: {str(e)}"
         )
 
-@router.get("/my-bookings", response_model=dict)
+# Indexes of the candidate slots that overlap an active booking, checked for
+# the whole batch in one statement. The booking_date window lets the planner
+# use the venue/date indexes before comparing ranges.
+SLOT_CONFLICTS = text(f"""
+    SELECT s.idx
+    FROM unnest(CAST(:idx AS integer[]), CAST(:starts AS timestamp[]), CAST(:ends AS timestamp[]))
+        AS s(idx, starts_at, ends_at)
+    WHERE EXISTS (
+        SELECT 1 FROM booking b
+        WHERE b.venue_id = :venue_id
+          AND b.status NOT IN ({", ".join(f"'{s}'" for s in INACTIVE_STATUSES)})
+          AND b.booking_date BETWEEN CAST(s.starts_at AS date) - 1 AND CAST(s.ends_at AS date)
+          AND tsrange(
+                b.booking_date + b.start_time,
+                b.booking_date + b.end_time
+                  + CASE WHEN b.end_time <= b.start_time THEN INTERVAL '1 day' ELSE INTERVAL '0' END,
+                '[)'
+              ) && tsrange(s.starts_at, s.ends_at, '[)')
+    )
+""")
+
+@router.post("/bulk", response_model=Envelope[BulkBookingResult])
+async def create_bulk_booking(
+    booking_data: BookingBulkCreate,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Book several slots at one venue at once, reporting which were booked and which conflicted"""
+    try:
+        await venue_catalog.ensure_fresh(db)
+        venue = venue_catalog.get(booking_data.venue_id)
+        if not venue:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Venue not found"
+            )
+        
+        slots = booking_data.expanded_slots()
+        ranges = []
+        for slot in slots:
+            starts_at = datetime.combine(slot.booking_date, slot.start_time)
+            ranges.append((starts_at, starts_at + timedelta(minutes=slot.duration_minutes)))
+        
+        # Slots in the same request may not overlap each other; the first one wins
+        reasons = {}
+        for i, (starts_at, ends_at) in enumerate(ranges):
+            for j in range(i):
+                if j not in reasons and ranges[j][0] < ends_at and starts_at < ranges[j][1]:
+                    reasons[i] = "Overlaps another slot in this request"
+                    break
+        
+        candidates = [i for i in range(len(slots)) if i not in reasons]
+        if candidates:
+            result = await db.execute(SLOT_CONFLICTS, {
+                "idx": candidates,
+                "starts": [ranges[i][0] for i in candidates],
+                "ends": [ranges[i][1] for i in candidates],
+                "venue_id": booking_data.venue_id
+            })
+            for (i,) in result:
+                reasons[i] = "This time slot is already booked"
+        
+        await price_book.ensure_fresh(db)
+        price_table = price_book.table_for(venue)
+        rows = {}
+        for i, slot in enumerate(slots):
+            if i in reasons:
+                continue
+            quote = price_table.quote(slot.booking_date, slot.start_time, slot.duration_minutes)
+            rows[i] = {
+                "id": uuid.uuid4(),
+                "user_id": current_user.id,
+                "venue_id": booking_data.venue_id,
+                "booking_date": slot.booking_date,
+                "start_time": slot.start_time,
+                "end_time": ranges[i][1].time(),
+                "duration_minutes": slot.duration_minutes,
+                "number_of_players": booking_data.number_of_players,
+                "team_name": booking_data.team_name,
+                "special_requests": booking_data.special_requests,
+                "price_per_hour": quote.price_per_hour,
+                "total_amount": quote.total_amount,
+                "status": 'pending',
+                "payment_status": 'pending'
+            }
+        
+        # One multi-row insert. DO NOTHING also covers the exclusion constraint,
+        # so a slot taken since the conflict check is skipped instead of
+        # failing the whole batch, and simply does not come back from RETURNING.
+        inserted = set()
+        if rows:
+            result = await db.execute(
+                insert(Booking).values(list(rows.values())).on_conflict_do_nothing().returning(Booking.id)
+            )
+            inserted = set(result.scalars().all())
+        await db.commit()
+        if inserted:
+            await read_router.mark_write(current_user)
+        
+        results = []
+        for i, slot in enumerate(slots):
+            row = rows.get(i)
+            booked = row is not None and row["id"] in inserted
+            if booked:
+                availability_index.add_booking(Booking(**row))
+            elif row is not None:
+                reasons[i] = "This time slot is already booked"
+                availability_index.invalidate(booking_data.venue_id, slot.booking_date)
+            results.append(BulkSlotResult(
+                booking_date=slot.booking_date,
+                start_time=slot.start_time,
+                end_time=ranges[i][1].time(),
+                duration_minutes=slot.duration_minutes,
+                status="booked" if booked else "conflict",
+                booking_id=row["id"] if booked else None,
+                total_amount=row["total_amount"] if booked else None,
+                reason=reasons.get(i)
+            ))
+        
+        booked_count = sum(1 for result in results if result.status == "booked")
+        return envelope(
+            BulkBookingResult(booked=booked_count, conflicts=len(results) - booked_count, results=results),
+            message=f"Booked {booked_count} of {len(results)} slots"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating bookings: {str(e)}"
+        )
+
+BOOKING_STATUSES = ('pending', 'confirmed', 'cancelled', 'completed', 'refunded')
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Columns loaded for the compact list projection (venue name/location come from the catalog)
+SUMMARY_COLUMNS = [
+    getattr(Booking, field) for field in BookingSummary.model_fields
+    if field not in ('venue_name', 'venue_location')
+]
+
+@router.get("/my-bookings", response_model=PageEnvelope[List[BookingSummary]])
 async def get_my_bookings(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    scope: Optional[str] = Query(None, pattern="^(upcoming|past)$"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get bookings for current user"""
+    """Get bookings for current user, newest first, one page at a time"""
     try:
-        bookings = db.query(Booking).filter(
-            Booking.user_id == current_user.id
-        ).order_by(Booking.booking_date.desc(), Booking.start_time.desc()).all()
+        query = select(*SUMMARY_COLUMNS).where(Booking.user_id == current_user.id)
+        
+        if status_filter:
+            if status_filter not in BOOKING_STATUSES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid status. Expected one of: {', '.join(BOOKING_STATUSES)}"
+                )
+            query = query.where(Booking.status == status_filter)
+        
+        if scope:
+            now = datetime.now(ZoneInfo(settings.BOOKING_TIMEZONE))
+            is_upcoming = or_(
+                Booking.booking_date > now.date(),
+                and_(Booking.booking_date == now.date(), Booking.start_time >= now.time().replace(tzinfo=None))
+            )
+            query = query.where(is_upcoming if scope == "upcoming" else ~is_upcoming)
+        
+        if cursor:
+            booking_date, start_time, booking_id = decode_cursor(cursor, 3)
+            try:
+                key = (date.fromisoformat(booking_date), time.fromisoformat(start_time), uuid.UUID(booking_id))
+            except (TypeError, ValueError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor"
+                )
+            query = query.where(tuple_(Booking.booking_date, Booking.start_time, Booking.id) < key)
+        
+        # Fetch one extra row to learn whether another page exists
+        query = query.order_by(
+            Booking.booking_date.desc(), Booking.start_time.desc(), Booking.id.desc()
+        ).limit(limit + 1)
+        rows = (await db.execute(query)).all()
+        
+        await venue_catalog.ensure_fresh(db)
+        bookings = []
+        for row in rows[:limit]:
+            booking = BookingSummary.model_validate(row)
+            venue = venue_catalog.get(booking.venue_id)
+            if venue:
+                booking.venue_name = venue.court_name
+                booking.venue_location = venue.location
+            bookings.append(booking)
+        
+        next_cursor = None
+        if len(rows) > limit:
+            last = bookings[-1]
+            next_cursor = encode_cursor([last.booking_date.isoformat(), last.start_time.isoformat(), str(last.id)])
         
-        return {
-            "success": True,
-            "data": bookings
-        }
+        return envelope(bookings, next_cursor=next_cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching bookings: {str(e)}"
         )
+
+@router.post("/{booking_id}/cancel", response_model=Envelope[BookingStatusResponse])
+async def cancel_booking(
+    booking_id: uuid.UUID,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cancel a booking made by the current user"""
+    try:
+        result = await db.execute(select(Booking).where(
+            Booking.id == booking_id,
+            Booking.user_id == current_user.id
+        ))
+        booking = result.scalars().first()
+        if not booking:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Booking not found"
+            )
+        
+        if booking.status not in ('pending', 'confirmed'):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot cancel a {booking.status} booking"
+            )
+        
+        booking.status = 'cancelled'
+        await db.commit()
+        availability_index.remove_booking(booking)
+        await read_router.mark_write(current_user)
+        
+        return envelope(
+            BookingStatusResponse(id=booking.id, status=booking.status),
+            message="Booking cancelled successfully"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error cancelling booking: {str(e)}"
+        )
@@ -1,34 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database import get_db
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..database import get_async_db
 from ..models.common import City, GameType
+from ..schemas.common import Envelope, CityResponse, GameTypeResponse
+from ..utils.cache import CachedBody, CachedLookup, cached_response, serialize_json
+from ..utils.read_routing import get_read_db
 
 router = APIRouter(prefix="/api/v1/common", tags=["Common"])
 
-@router.get("/cities", response_model=dict)
-async def get_cities(db: Session = Depends(get_db)):
+async def load_cities(db: AsyncSession) -> CachedBody:
+    """Load all active cities as a pre-serialized response"""
+    result = await db.execute(select(City).where(City.is_active == True).order_by(City.name))
+    cities = result.scalars().all()
+    return CachedBody(serialize_json({
+        "success": True,
+        "data": [CityResponse.model_validate(city) for city in cities]
+    }))
+
+async def load_game_types(db: AsyncSession) -> CachedBody:
+    """Load all active game types as a pre-serialized response"""
+    result = await db.execute(select(GameType).where(GameType.is_active == True).order_by(GameType.name))
+    game_types = result.scalars().all()
+    return CachedBody(serialize_json({
+        "success": True,
+        "data": [GameTypeResponse.model_validate(game_type) for game_type in game_types]
+    }))
+
+cities_cache = CachedLookup("cities", load_cities, settings.LOOKUP_CACHE_TTL_SECONDS)
+game_types_cache = CachedLookup("game_types", load_game_types, settings.LOOKUP_CACHE_TTL_SECONDS)
+
+def invalidate_lookup_caches() -> None:
+    """Drop cached cities and game types so the next request reloads them"""
+    cities_cache.invalidate()
+    game_types_cache.invalidate()
+
+@router.get("/cities", response_model=Envelope[List[CityResponse]])
+async def get_cities(request: Request, db: AsyncSession = Depends(get_read_db)):
     """Get all active cities"""
     try:
-        cities = db.query(City).filter(City.is_active == True).order_by(City.name).all()
-        return {
-            "success": True,
-            "data": cities
-        }
+        return cached_response(request, await cities_cache.get(db))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching cities: {str(e)}"
         )
 
-@router.get("/game-types", response_model=dict)
-async def get_game_types(db: Session = Depends(get_db)):
+@router.get("/game-types", response_model=Envelope[List[GameTypeResponse]])
+async def get_game_types(request: Request, db: AsyncSession = Depends(get_read_db)):
     """Get all active game types"""
     try:
-        game_types = db.query(GameType).filter(GameType.is_active == True).order_by(GameType.name).all()
-        return {
-            "success": True,
-            "data": game_types
-        }
+        return cached_response(request, await game_types_cache.get(db))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
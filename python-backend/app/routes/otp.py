@@ -1,107 +1,131 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 import random
+import time
 import uuid
-from ..database import get_db
-from ..models.otp import OTPVerification
+from ..config import settings
+from ..database import get_async_db
 from ..models.user import User
 from ..schemas.otp import OTPRequest, OTPVerify, OTPResponse
-from ..utils.auth import create_access_token
+from ..utils.auth import create_access_token, invalidate_user_cache
+from ..utils.idempotency import IdempotentRoute
+from ..utils.otp_audit import otp_audit_log
+from ..utils.otp_store import OTPRecord, otp_store
+from ..utils.rate_limit import create_rate_limiter
+from ..utils.read_routing import read_router
 
-router = APIRouter(prefix="/api/v1/otp", tags=["OTP"])
+router = APIRouter(prefix="/api/v1/otp", tags=["OTP"], route_class=IdempotentRoute)
 
 DUMMY_OTP = "12345"
 
+# Kept in Redis alongside the codes when OTP_STORE_BACKEND=redis; with the
+# memory store there is a single worker, so per-process buckets are exact
+phone_limiter = create_rate_limiter(
+    "otp_phone", settings.OTP_PHONE_BURST, settings.OTP_PHONE_REFILL_PER_MINUTE,
+    backend=settings.OTP_STORE_BACKEND, redis_url=settings.REDIS_URL
+)
+ip_limiter = create_rate_limiter(
+    "otp_ip", settings.OTP_IP_BURST, settings.OTP_IP_REFILL_PER_MINUTE,
+    backend=settings.OTP_STORE_BACKEND, redis_url=settings.REDIS_URL
+)
+
+def client_ip(http_request: Request) -> str:
+    """Address of the caller.
+
+    X-Forwarded-For is only believed when the connection comes from one of
+    TRUSTED_PROXY_IPS, since anyone else can put any address in it. The
+    client is then the last address in it that is not a trusted proxy.
+    """
+    peer = http_request.client.host if http_request.client else "unknown"
+    trusted = settings.trusted_proxy_ips
+    if peer not in trusted:
+        return peer
+    forwarded = [address.strip() for address in http_request.headers.get("x-forwarded-for", "").split(",")]
+    for address in reversed(forwarded):
+        if address and address not in trusted:
+            return address
+    return peer
+
 @router.post("/send", response_model=OTPResponse)
-async def send_otp(request: OTPRequest, db: Session = Depends(get_db)):
+async def send_otp(request: OTPRequest, http_request: Request):
     """Send OTP to phone number"""
     try:
+        await ip_limiter.check(client_ip(http_request))
+        await phone_limiter.check(request.phone_number, detail="Too many OTP requests for this number, please try again later")
+        
         # In a real app, you would integrate with an SMS provider here
         # For now, we'll use a dummy OTP or generate one
         otp_code = DUMMY_OTP # or str(random.randint(10000, 99999))
+        expires_at = datetime.utcnow() + timedelta(minutes=settings.OTP_TTL_MINUTES)
         
-        # Check if there's an existing active OTP
-        existing_otp = db.query(OTPVerification).filter(
-            OTPVerification.phone_number == request.phone_number,
-            OTPVerification.is_verified == False,
-            OTPVerification.expires_at > datetime.utcnow()
-        ).first()
-        
-        if existing_otp:
-            # Update existing OTP
-            existing_otp.otp_code = otp_code
-            existing_otp.expires_at = datetime.utcnow() + timedelta(minutes=10)
-            existing_otp.attempts = 0
-            db.commit()
-        else:
-            # Create new OTP record
-            new_otp = OTPVerification(
-                id=uuid.uuid4(),
-                phone_number=request.phone_number,
-                country_code=request.country_code,
-                otp_code=otp_code,
-                expires_at=datetime.utcnow() + timedelta(minutes=10),
-                created_at=datetime.utcnow()
-            )
-            db.add(new_otp)
-            db.commit()
+        # Replaces any pending code for this number and resets its attempts
+        await otp_store.put(OTPRecord(
+            phone_number=request.phone_number,
+            country_code=request.country_code,
+            otp_code=otp_code,
+            expires_at=time.time() + settings.OTP_TTL_MINUTES * 60,
+            max_attempts=settings.OTP_MAX_ATTEMPTS
+        ))
+        otp_audit_log.record_sent(
+            phone_number=request.phone_number,
+            country_code=request.country_code,
+            otp_code=otp_code,
+            expires_at=expires_at,
+            ip_address=client_ip(http_request),
+            user_agent=http_request.headers.get("user-agent")
+        )
         
         return {
             "success": True,
             "message": "OTP sent successfully",
-            "expires_at": datetime.utcnow() + timedelta(minutes=10)
+            "expires_at": expires_at
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error sending OTP: {str(e)}"
         )
 
 @router.post("/verify", response_model=dict)
-async def verify_otp(request: OTPVerify, db: Session = Depends(get_db)):
+async def verify_otp(request: OTPVerify, http_request: Request, db: AsyncSession = Depends(get_async_db)):
     """Verify OTP code"""
     try:
-        # Find the OTP record
-        otp_record = db.query(OTPVerification).filter(
-            OTPVerification.phone_number == request.phone_number,
-            OTPVerification.is_verified == False,
-            OTPVerification.expires_at > datetime.utcnow()
-        ).order_by(OTPVerification.created_at.desc()).first()
+        await ip_limiter.check(client_ip(http_request))
+        
+        # Checks the attempt limit, compares and counts the guess (or uses
+        # up the code, since codes are single use) in one atomic step
+        outcome, otp_record = await otp_store.verify(request.phone_number, request.otp_code)
         
-        if not otp_record:
+        if outcome == "missing":
             return {
                 "success": False,
                 "message": "Invalid or expired OTP",
                 "user_id": None
             }
         
-        # Check attempts
-        if otp_record.attempts >= otp_record.max_attempts:
+        if outcome == "locked":
             return {
                 "success": False,
                 "message": "Too many failed attempts",
                 "user_id": None
             }
             
-        # Verify code
-        if otp_record.otp_code != request.otp_code:
-            otp_record.attempts += 1
-            db.commit()
+        if outcome == "wrong":
             return {
                 "success": False,
                 "message": "Invalid OTP code",
                 "user_id": None
             }
             
-        # Mark as verified
-        otp_record.is_verified = True
-        otp_record.verified_at = datetime.utcnow()
+        otp_audit_log.record_verified(request.phone_number, otp_record.attempts)
         
         # Get or create user
-        user = db.query(User).filter(User.phone_number == request.phone_number).first()
+        result = await db.execute(select(User).where(User.phone_number == request.phone_number))
+        user = result.scalars().first()
         
         if not user:
             # Create new user
@@ -122,11 +146,13 @@ async def verify_otp(request: OTPVerify, db: Session = Depends(get_db)):
             user.is_verified = True
             user.last_login_at = datetime.utcnow()
             
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        invalidate_user_cache(user)
+        await read_router.mark_write(user)
         
         # Generate token
-        access_token = create_access_token(data={"sub": user.email or user.phone_number})
+        access_token = create_access_token(data={"sub": str(user.id)})
         
         return {
             "success": True,
@@ -144,8 +170,10 @@ async def verify_otp(request: OTPVerify, db: Session = Depends(get_db)):
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error verifying OTP: {str(e)}"
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
 from ..models.user import User
 from ..schemas.user import UserUpdate, AuthResponse
-from ..utils.auth import get_current_user
+from ..utils.auth import get_current_user_model, invalidate_user_cache
+from ..utils.read_routing import get_read_db, read_router
 from typing import Optional
 
 router = APIRouter(prefix="/api/v1/profile", tags=["Profile"])
@@ -11,11 +13,14 @@ router = APIRouter(prefix="/api/v1/profile", tags=["Profile"])
 @router.post("/save", response_model=AuthResponse)
 async def save_user_profile(
     profile_data: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_model),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save or update user profile"""
     try:
+        # Drop the cached principal while its old email/phone are still known
+        invalidate_user_cache(current_user)
+        
         # Update user fields
         for key, value in profile_data.dict(exclude_unset=True).items():
             setattr(current_user, key, value)
@@ -24,8 +29,10 @@ async def save_user_profile(
         if current_user.full_name:
             current_user.profile_completed = True
             
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        await db.refresh(current_user)
+        invalidate_user_cache(current_user)
+        await read_router.mark_write(current_user)
         
         return {
             "success": True,
@@ -50,17 +57,18 @@ async def save_user_profile(
             }
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error saving profile: {str(e)}"
         )
 
 @router.get("/{phone_number}", response_model=AuthResponse)
-async def get_user_profile_by_phone(phone_number: str, db: Session = Depends(get_db)):
+async def get_user_profile_by_phone(phone_number: str, db: AsyncSession = Depends(get_read_db)):
     """Get user profile by phone number"""
     try:
-        user = db.query(User).filter(User.phone_number == phone_number).first()
+        result = await db.execute(select(User).where(User.phone_number == phone_number))
+        user = result.scalars().first()
         
         if not user:
             raise HTTPException(
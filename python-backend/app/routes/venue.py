@@ -1,41 +1,161 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from datetime import date, datetime, time, timedelta
+import uuid
+from ..database import get_async_db
 from ..models.venue import Venue
-from ..schemas.venue import VenueResponse
+from ..schemas.common import Envelope, PageEnvelope
+from ..schemas.venue import VenueResponse, VenueSummary, NearbyVenue, VenueAvailability, VenueQuote
+from ..utils.availability import availability_index, minute_to_time, MINUTES_PER_DAY
+from ..utils.cache import cached_response
+from ..utils.pagination import encode_cursor, decode_cursor, escape_like
+from ..utils.pricing import price_book
+from ..utils.read_routing import get_read_db
+from ..utils.responses import FastJSONResponse, envelope
+from ..utils.venue_catalog import venue_catalog
 
 router = APIRouter(prefix="/api/v1/venues", tags=["Venues"])
 
-@router.get("/", response_model=dict)
-async def get_venues(db: Session = Depends(get_db)):
-    """Get all venues"""
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_QUOTE_SLOTS = 48
+MAX_NEARBY_RADIUS_KM = 100
+
+# Columns loaded for the compact list projection
+SUMMARY_COLUMNS = [getattr(Venue, field) for field in VenueSummary.model_fields]
+
+async def get_venue_page(
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str],
+    game_type: Optional[str],
+    city: Optional[str]
+) -> FastJSONResponse:
+    """Fetch one page of venues ordered by (created_at DESC, id DESC)"""
+    query = select(*SUMMARY_COLUMNS)
+    if game_type:
+        query = query.where(Venue.game_type.ilike(f"%{escape_like(game_type)}%", escape="\\"))
+    if city:
+        query = query.where(Venue.location.ilike(f"%{escape_like(city)}%", escape="\\"))
+    if cursor:
+        created_at, venue_id = decode_cursor(cursor, 2)
+        try:
+            key = (datetime.fromisoformat(created_at), uuid.UUID(venue_id))
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.where(tuple_(Venue.created_at, Venue.id) < key)
+    
+    # Fetch one extra row to learn whether another page exists
+    query = query.order_by(Venue.created_at.desc(), Venue.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    
+    venues = [VenueSummary.model_validate(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and venues[-1].created_at is not None:
+        last = venues[-1]
+        next_cursor = encode_cursor([last.created_at.isoformat(), str(last.id)])
+    
+    return envelope(venues, next_cursor=next_cursor)
+
+@router.get("/", response_model=Union[PageEnvelope[List[VenueSummary]], Envelope[List[VenueResponse]]])
+async def get_venues(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    game_type: Optional[str] = None,
+    city: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get venues.
+    
+    Passing limit, cursor or a filter returns a compact page of venues and a
+    next_cursor; without them the full catalog is returned as before.
+    """
     try:
-        venues = db.query(Venue).all()
-        return {
-            "success": True,
-            "data": venues
-        }
+        if limit is None and cursor is None and game_type is None and city is None:
+            await venue_catalog.ensure_fresh(db)
+            return cached_response(request, venue_catalog.list_entry)
+        
+        return await get_venue_page(db, limit or DEFAULT_PAGE_SIZE, cursor, game_type, city)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching venues: {str(e)}"
         )
 
-@router.get("/{venue_id}", response_model=dict)
-async def get_venue(venue_id: str, db: Session = Depends(get_db)):
+@router.get("/nearby", response_model=PageEnvelope[List[NearbyVenue]])
+async def get_nearby_venues(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(10, gt=0, le=MAX_NEARBY_RADIUS_KM, description="Search radius in km"),
+    game_type: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get venues within radius km of a point, nearest first, one page at a time"""
+    try:
+        after = None
+        if cursor:
+            distance, venue_id = decode_cursor(cursor, 2)
+            try:
+                after = (float(distance), str(uuid.UUID(venue_id)))
+            except (TypeError, ValueError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor"
+                )
+        
+        await venue_catalog.ensure_fresh(db)
+        matches = [
+            (distance, str(venue.id), venue)
+            for distance, venue in venue_catalog.grid.within(lat, lng, radius)
+            if not game_type or game_type.lower() in (venue.game_type or "").lower()
+        ]
+        if after:
+            matches = [match for match in matches if match[:2] > after]
+        matches.sort(key=lambda match: match[:2])
+        
+        venues = [
+            NearbyVenue(**VenueSummary.model_validate(venue).model_dump(), distance_km=round(distance, 3))
+            for distance, _, venue in matches[:limit]
+        ]
+        next_cursor = None
+        if len(matches) > limit:
+            distance, venue_id, _ = matches[limit - 1]
+            next_cursor = encode_cursor([repr(distance), venue_id])
+        
+        return envelope(venues, next_cursor=next_cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching nearby venues: {str(e)}"
+        )
+
+@router.get("/{venue_id}", response_model=Envelope[VenueResponse])
+async def get_venue(venue_id: str, request: Request, db: AsyncSession = Depends(get_read_db)):
     """Get venue by ID"""
     try:
-        venue = db.query(Venue).filter(Venue.id == venue_id).first()
-        if not venue:
+        await venue_catalog.ensure_fresh(db)
+        try:
+            entry = venue_catalog.get_entry(uuid.UUID(venue_id))
+        except ValueError:
+            entry = None
+        if not entry:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Venue not found"
             )
-        return {
-            "success": True,
-            "data": venue
-        }
+        return cached_response(request, entry)
     except HTTPException:
         raise
     except Exception as e:
@@ -43,3 +163,104 @@ async def get_venue(venue_id: str, db: Session = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching venue: {str(e)}"
         )
+
+@router.get("/{venue_id}/availability", response_model=Envelope[VenueAvailability])
+async def get_venue_availability(
+    venue_id: uuid.UUID,
+    date: date,
+    slot_minutes: int = Query(60, ge=15, le=240),
+    # Not the replica: the days loaded here are cached in the index that
+    # create_booking consults, so a lagging copy would hide fresh bookings
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get booked and free time ranges for a venue on a date"""
+    try:
+        await venue_catalog.ensure_fresh(db)
+        if not venue_catalog.get(venue_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Venue not found"
+            )
+        
+        day = await availability_index.get_day(db, venue_id, date)
+        slots = [
+            {
+                "start_time": minute_to_time(start),
+                "end_time": minute_to_time(min(start + slot_minutes, MINUTES_PER_DAY)),
+                "available": day.is_free(start, min(start + slot_minutes, MINUTES_PER_DAY))
+            }
+            for start in range(0, MINUTES_PER_DAY, slot_minutes)
+        ]
+        
+        return envelope({
+            "venue_id": str(venue_id),
+            "date": date.isoformat(),
+            "booked": [
+                {"start_time": minute_to_time(start), "end_time": minute_to_time(end)}
+                for start, end in day.intervals(booked=True)
+            ],
+            "free": [
+                {"start_time": minute_to_time(start), "end_time": minute_to_time(end)}
+                for start, end in day.intervals(booked=False)
+            ],
+            "slots": slots
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching availability: {str(e)}"
+        )
+
+@router.get("/{venue_id}/quote", response_model=Envelope[VenueQuote])
+async def get_venue_quote(
+    venue_id: uuid.UUID,
+    date: date,
+    start_time: Optional[List[time]] = Query(None),
+    duration_minutes: int = Query(60, gt=0, lt=24 * 60),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Price one or more slots at a venue without booking them (repeat start_time for several)"""
+    try:
+        if not start_time or len(start_time) > MAX_QUOTE_SLOTS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Give between 1 and {MAX_QUOTE_SLOTS} start_time values"
+            )
+        
+        await venue_catalog.ensure_fresh(db)
+        venue = venue_catalog.get(venue_id)
+        if not venue:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Venue not found"
+            )
+        
+        await price_book.ensure_fresh(db)
+        table = price_book.table_for(venue)
+        slots = []
+        for slot_start in start_time:
+            quote = table.quote(date, slot_start, duration_minutes)
+            slots.append({
+                "start_time": slot_start,
+                "end_time": (datetime.combine(date, slot_start) + timedelta(minutes=duration_minutes)).time(),
+                "duration_minutes": duration_minutes,
+                "price_per_hour": quote.price_per_hour,
+                "total_amount": quote.total_amount,
+                "is_peak": quote.is_peak
+            })
+        
+        return envelope({
+            "venue_id": str(venue_id),
+            "date": date.isoformat(),
+            "total_amount": sum(slot["total_amount"] for slot in slots),
+            "slots": slots
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error quoting venue: {str(e)}"
+        )
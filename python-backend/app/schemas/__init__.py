@@ -7,14 +7,19 @@ from .user import (
     UserLogin,
     Token,
     TokenData,
+    UserPrincipal,
     AuthResponse,
     ProfileBase,
     ProfileCreate,
     ProfileResponse
 )
-from .venue import VenueBase, VenueCreate, VenueResponse
-from .booking import BookingBase, BookingCreate, BookingResponse
+from .venue import VenueBase, VenueCreate, VenueResponse, VenueSummary, NearbyVenue, TimeRange, AvailabilitySlot, VenueAvailability, SlotQuote, VenueQuote
+from .booking import (
+    BookingBase, BookingCreate, BookingResponse, BookingSummary, BookingStatusResponse,
+    BookingSlot, RecurrenceRule, BookingBulkCreate, BulkSlotResult, BulkBookingResult
+)
 from .otp import OTPRequest, OTPVerify, OTPResponse
+from .common import Envelope, PageEnvelope, CityResponse, GameTypeResponse
 
 __all__ = [
     "UserBase",
@@ -25,6 +30,7 @@ __all__ = [
     "UserLogin",
     "Token",
     "TokenData",
+    "UserPrincipal",
     "AuthResponse",
     "ProfileBase",
     "ProfileCreate",
@@ -32,10 +38,28 @@ __all__ = [
     "VenueBase",
     "VenueCreate",
     "VenueResponse",
+    "VenueSummary",
+    "NearbyVenue",
+    "TimeRange",
+    "AvailabilitySlot",
+    "VenueAvailability",
+    "SlotQuote",
+    "VenueQuote",
     "BookingBase",
     "BookingCreate",
     "BookingResponse",
+    "BookingSummary",
+    "BookingStatusResponse",
+    "BookingSlot",
+    "RecurrenceRule",
+    "BookingBulkCreate",
+    "BulkSlotResult",
+    "BulkBookingResult",
     "OTPRequest",
     "OTPVerify",
-    "OTPResponse"
+    "OTPResponse",
+    "Envelope",
+    "PageEnvelope",
+    "CityResponse",
+    "GameTypeResponse"
 ]
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
-from datetime import date, time, datetime
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
+from datetime import date, time, datetime, timedelta
 from decimal import Decimal
 import uuid
 
@@ -8,7 +8,7 @@ class BookingBase(BaseModel):
     venue_id: uuid.UUID
     booking_date: date
     start_time: time
-    duration_minutes: int
+    duration_minutes: int = Field(..., gt=0, lt=24 * 60)
     number_of_players: Optional[int] = 2
     team_name: Optional[str] = None
     special_requests: Optional[str] = None
@@ -31,3 +31,102 @@ class BookingResponse(BookingBase):
     
     class Config:
         from_attributes = True
+
+class BookingSummary(BaseModel):
+    """Compact booking projection for list views"""
+    id: uuid.UUID
+    venue_id: uuid.UUID
+    venue_name: Optional[str] = None
+    venue_location: Optional[str] = None
+    booking_date: date
+    start_time: time
+    end_time: time
+    duration_minutes: int
+    number_of_players: Optional[int] = None
+    team_name: Optional[str] = None
+    special_requests: Optional[str] = None
+    total_amount: Decimal
+    status: str
+    payment_status: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+class BookingStatusResponse(BaseModel):
+    id: uuid.UUID
+    status: str
+
+# Upper bound on the slots one bulk request may book (a year of weekly games)
+MAX_BULK_SLOTS = 52
+
+class BookingSlot(BaseModel):
+    booking_date: date
+    start_time: time
+    duration_minutes: int = Field(..., gt=0, lt=24 * 60)
+
+class RecurrenceRule(BaseModel):
+    """Repeat the first slot every interval days or weeks, count times or until a date"""
+    frequency: Literal["daily", "weekly"] = "weekly"
+    interval: int = Field(1, ge=1)
+    count: Optional[int] = Field(None, ge=1, le=MAX_BULK_SLOTS)
+    until: Optional[date] = None
+
+    @model_validator(mode="after")
+    def check_end(self):
+        if (self.count is None) == (self.until is None):
+            raise ValueError("Give exactly one of count or until")
+        return self
+
+    def expand(self, first: BookingSlot) -> List[BookingSlot]:
+        step = timedelta(days=self.interval * (7 if self.frequency == "weekly" else 1))
+        slots = []
+        booking_date = first.booking_date
+        while len(slots) < (self.count or MAX_BULK_SLOTS + 1):
+            if self.until is not None and booking_date > self.until:
+                break
+            slots.append(first.model_copy(update={"booking_date": booking_date}))
+            booking_date += step
+        return slots
+
+class BookingBulkCreate(BaseModel):
+    """Either an explicit list of slots, or one slot plus a recurrence rule"""
+    venue_id: uuid.UUID
+    slots: Optional[List[BookingSlot]] = None
+    slot: Optional[BookingSlot] = None
+    recurrence: Optional[RecurrenceRule] = None
+    number_of_players: Optional[int] = 2
+    team_name: Optional[str] = None
+    special_requests: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_slots(self):
+        if self.slots is not None:
+            if self.slot is not None or self.recurrence is not None:
+                raise ValueError("Give either slots or slot with recurrence, not both")
+            if not self.slots:
+                raise ValueError("slots must not be empty")
+        elif self.slot is None or self.recurrence is None:
+            raise ValueError("Give slots, or slot together with recurrence")
+        if len(self.expanded_slots()) > MAX_BULK_SLOTS:
+            raise ValueError(f"At most {MAX_BULK_SLOTS} slots can be booked at once")
+        return self
+
+    def expanded_slots(self) -> List[BookingSlot]:
+        if self.slots is not None:
+            return self.slots
+        return self.recurrence.expand(self.slot)
+
+class BulkSlotResult(BaseModel):
+    booking_date: date
+    start_time: time
+    end_time: time
+    duration_minutes: int
+    status: Literal["booked", "conflict"]
+    booking_id: Optional[uuid.UUID] = None
+    total_amount: Optional[Decimal] = None
+    reason: Optional[str] = None
+
+class BulkBookingResult(BaseModel):
+    booked: int
+    conflicts: int
+    results: List[BulkSlotResult]
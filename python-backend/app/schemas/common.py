@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+from typing import Generic, Optional, TypeVar
+import uuid
+
+T = TypeVar("T")
+
+class Envelope(BaseModel, Generic[T]):
+    """Standard response wrapper: {"success": true, "message": ..., "data": ...}"""
+    success: bool = True
+    message: Optional[str] = None
+    data: T
+
+class PageEnvelope(Envelope[T], Generic[T]):
+    """Envelope for keyset-paginated lists"""
+    next_cursor: Optional[str] = None
+
+class CityResponse(BaseModel):
+    id: uuid.UUID
+    name: str
+    short_code: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class GameTypeResponse(BaseModel):
+    id: uuid.UUID
+    name: str
+    short_code: Optional[str] = None
+    description: Optional[str] = None
+    icon: Optional[str] = None
+    icon_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
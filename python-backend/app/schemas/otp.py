@@ -1,14 +1,15 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 import uuid
+from .user import PHONE_NUMBER_PATTERN
 
 class OTPRequest(BaseModel):
-    phone_number: str
+    phone_number: str = Field(..., pattern=PHONE_NUMBER_PATTERN)
     country_code: str = "+91"
 
 class OTPVerify(BaseModel):
-    phone_number: str
+    phone_number: str = Field(..., pattern=PHONE_NUMBER_PATTERN)
     otp_code: str
 
 class OTPResponse(BaseModel):
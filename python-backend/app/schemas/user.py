@@ -3,9 +3,12 @@ from typing import Optional, List, Any
 from datetime import datetime
 import uuid
 
+# Digits with an optional leading +, so a phone number can never look like an email
+PHONE_NUMBER_PATTERN = r"^\+?[0-9]{6,15}$"
+
 # User Schemas
 class UserBase(BaseModel):
-    phone_number: Optional[str] = None
+    phone_number: Optional[str] = Field(None, pattern=PHONE_NUMBER_PATTERN)
     email: Optional[EmailStr] = None
     full_name: Optional[str] = None
     first_name: Optional[str] = None
@@ -55,7 +58,23 @@ class Token(BaseModel):
     token_type: str = "bearer"
 
 class TokenData(BaseModel):
+    user_id: Optional[uuid.UUID] = None
+    # Email or phone number subject of a token issued before user ids
+    legacy_subject: Optional[str] = None
+
+class UserPrincipal(BaseModel):
+    """The authenticated user as seen by read-only routes"""
+    id: uuid.UUID
     email: Optional[str] = None
+    phone_number: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    full_name: Optional[str] = None
+    avatar_url: Optional[str] = None
+    is_active: Optional[bool] = True
+    
+    class Config:
+        from_attributes = True
 
 class AuthResponse(BaseModel):
     success: bool
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime, time
+from decimal import Decimal
 import uuid
 
 class VenueBase(BaseModel):
@@ -11,14 +12,62 @@ class VenueBase(BaseModel):
     description: Optional[str] = None
     photos: Optional[List[str]] = None
     videos: Optional[List[str]] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 class VenueCreate(VenueBase):
     pass
 
 class VenueResponse(VenueBase):
     id: uuid.UUID
-    created_at: datetime
-    updated_at: datetime
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+
+class VenueSummary(BaseModel):
+    """Compact venue projection for list views (no description or videos)"""
+    id: uuid.UUID
+    game_type: Optional[str] = None
+    court_name: Optional[str] = None
+    location: Optional[str] = None
+    prices: Optional[str] = None
+    photos: Optional[List[str]] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class NearbyVenue(VenueSummary):
+    distance_km: float
+
+class TimeRange(BaseModel):
+    start_time: str  # HH:MM, 24:00 for end of day
+    end_time: str
+
+class AvailabilitySlot(TimeRange):
+    available: bool
+
+class VenueAvailability(BaseModel):
+    venue_id: uuid.UUID
+    date: date
+    booked: List[TimeRange]
+    free: List[TimeRange]
+    slots: List[AvailabilitySlot]
+
+class SlotQuote(BaseModel):
+    start_time: time
+    end_time: time
+    duration_minutes: int
+    price_per_hour: Decimal
+    total_amount: Decimal
+    is_peak: bool
+
+class VenueQuote(BaseModel):
+    venue_id: uuid.UUID
+    date: date
+    total_amount: Decimal
+    slots: List[SlotQuote]
@@ -1,15 +1,23 @@
 from .auth import (
     verify_password,
     get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     decode_access_token,
-    get_current_user
+    get_current_user,
+    get_current_user_model,
+    invalidate_user_cache
 )
 
 __all__ = [
     "verify_password",
     "get_password_hash",
+    "verify_password_async",
+    "get_password_hash_async",
     "create_access_token",
     "decode_access_token",
-    "get_current_user"
+    "get_current_user",
+    "get_current_user_model",
+    "invalidate_user_cache"
 ]
@@ -1,28 +1,68 @@
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..config import settings
-from ..database import get_db
+from ..database import get_async_db
 from ..models.user import User
-from ..schemas.user import TokenData
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from ..schemas.user import TokenData, UserPrincipal
+from .cache import TTLCache
+from .hashing import hashing_pool
+from .jwt_backends import TokenBackend, create_token_backend
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+# The password hasher and JWT backend are built on first use (or by the
+# startup warm-up), so importing the app does not load passlib, jose and
+# cryptography
+_pwd_context = None
+_token_backend = None
+
+# Successfully verified tokens, kept no longer than their exp claim
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS)
+
+# Resolved principals keyed by user id (the token subject), or by the email
+# or phone number subject of a legacy token
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
+
+# Columns loaded to build a UserPrincipal
+PRINCIPAL_COLUMNS = [getattr(User, field) for field in UserPrincipal.model_fields]
+
+def get_pwd_context():
+    """bcrypt password context"""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+def get_token_backend() -> TokenBackend:
+    """JWT signing/verification with key material prepared once"""
+    global _token_backend
+    if _token_backend is None:
+        _token_backend = create_token_backend(settings.JWT_BACKEND, settings.SECRET_KEY, settings.ALGORITHM)
+    return _token_backend
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop"""
+    return await hashing_pool.run("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop"""
+    return await hashing_pool.run("hash", get_password_hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
@@ -33,43 +73,82 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = get_token_backend().encode(to_encode)
     return encoded_jwt
 
 def decode_access_token(token: str) -> TokenData:
     """Decode and verify a JWT token"""
+    token_data = token_cache.get(token)
+    if token_data is not None:
+        return token_data
+    backend = get_token_backend()
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token or user not found.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return TokenData(email=email)
-    except JWTError:
+        payload = backend.decode(token)
+        subject = payload.get("sub")
+        try:
+            # The subject is the user's id; email and phone number can change
+            # hands, an id cannot
+            token_data = TokenData(user_id=uuid.UUID(subject))
+        except (TypeError, ValueError):
+            if not (settings.ACCEPT_LEGACY_TOKEN_SUBJECTS and isinstance(subject, str) and subject):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid token or user not found.",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            token_data = TokenData(legacy_subject=subject)
+        exp = payload.get("exp")
+        ttl = settings.TOKEN_CACHE_TTL_SECONDS if exp is None else min(settings.TOKEN_CACHE_TTL_SECONDS, exp - time.time())
+        if ttl > 0:
+            token_cache.set(token, token_data, ttl_seconds=ttl)
+        return token_data
+    except backend.errors:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token.",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+def invalidate_user_cache(user) -> None:
+    """Forget the cached principal of a user whose row was just written"""
+    for key in (user.id, user.email, user.phone_number):
+        if key:
+            user_cache.pop(key)
+
+def legacy_subject_filter(subject: str):
+    """Match the user a pre-user-id token was issued to.
+
+    Email logins put the email in sub and OTP logins the phone number, so an
+    @ tells them apart; never match both columns at once.
+    """
+    if "@" in subject:
+        return User.email == subject
+    return User.phone_number == subject
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
     """Get the current authenticated user"""
     token = credentials.credentials
     token_data = decode_access_token(token)
+    if token_data.user_id is not None:
+        cache_key, condition = token_data.user_id, User.id == token_data.user_id
+    else:
+        cache_key, condition = token_data.legacy_subject, legacy_subject_filter(token_data.legacy_subject)
     
-    user = db.query(User).filter(User.email == token_data.email).first()
+    user = user_cache.get(cache_key)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token or user not found.",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        result = await db.execute(select(*PRINCIPAL_COLUMNS).where(condition))
+        row = result.first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token or user not found.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user = UserPrincipal.model_validate(row)
+        user_cache.set(cache_key, user)
     
     if not user.is_active:
         raise HTTPException(
@@ -78,3 +157,18 @@ async def get_current_user(
         )
     
     return user
+
+async def get_current_user_model(
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get the current authenticated user as an ORM object, for routes that write to it"""
+    user = await db.get(User, current_user.id)
+    if user is None:
+        invalidate_user_cache(current_user)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token or user not found.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
@@ -0,0 +1,178 @@
+import asyncio
+import time as _time
+from collections import OrderedDict
+from datetime import date, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..models.booking import Booking
+
+MINUTES_PER_DAY = 24 * 60
+
+# Bookings in these states do not hold their slot
+INACTIVE_STATUSES = ("cancelled", "refunded")
+
+def time_to_minute(value: time) -> int:
+    """Minute of the day for a time, seconds are ignored"""
+    return value.hour * 60 + value.minute
+
+def minute_to_time(minute: int) -> str:
+    """Format a minute of the day as HH:MM (1440 is rendered as 24:00)"""
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+def booking_spans(booking_date: date, start_time: time, end_time: time) -> List[Tuple[date, int, int]]:
+    """Split a booking into (date, start_minute, end_minute) spans.
+
+    A booking whose end time is not after its start time runs past midnight
+    and also occupies the beginning of the next day.
+    """
+    start = time_to_minute(start_time)
+    end = time_to_minute(end_time)
+    if end > start:
+        return [(booking_date, start, end)]
+    spans = [(booking_date, start, MINUTES_PER_DAY)]
+    if end > 0:
+        spans.append((booking_date + timedelta(days=1), 0, end))
+    return spans
+
+def range_mask(start: int, end: int) -> int:
+    """Bitmask with one bit set per minute in [start, end)"""
+    return ((1 << (end - start)) - 1) << start
+
+class DayOccupancy:
+    """Booked minutes of one venue on one date, kept as a 1440-bit mask"""
+
+    __slots__ = ("bookings", "mask", "loaded_at")
+
+    def __init__(self):
+        self.bookings: Dict[object, Tuple[int, int]] = {}
+        self.mask = 0
+        self.loaded_at = _time.monotonic()
+
+    def add(self, booking_id, start: int, end: int) -> None:
+        self.bookings[booking_id] = (start, end)
+        self.mask |= range_mask(start, end)
+
+    def remove(self, booking_id) -> None:
+        if self.bookings.pop(booking_id, None) is None:
+            return
+        # Bookings never overlap, but rebuild rather than clear bits in case
+        # rows written outside the API do
+        mask = 0
+        for start, end in self.bookings.values():
+            mask |= range_mask(start, end)
+        self.mask = mask
+
+    def is_free(self, start: int, end: int) -> bool:
+        return not self.mask & range_mask(start, end)
+
+    def intervals(self, booked: bool) -> List[Tuple[int, int]]:
+        """Merged booked (or free) minute ranges for the day"""
+        mask = self.mask if booked else ~self.mask & range_mask(0, MINUTES_PER_DAY)
+        result = []
+        minute = 0
+        while mask:
+            # Skip to the next set bit, then measure the run of set bits
+            skip = (mask & -mask).bit_length() - 1
+            mask >>= skip
+            minute += skip
+            run = (~mask & (mask + 1)).bit_length() - 1
+            result.append((minute, minute + run))
+            mask >>= run
+            minute += run
+        return result
+
+class AvailabilityIndex:
+    """In-process per-venue, per-day occupancy cache built from booking rows.
+
+    Days are loaded from the database on first use and reloaded once they are
+    older than AVAILABILITY_TTL_SECONDS, so bookings written by other workers
+    show up within that window. Bookings made or cancelled through this worker
+    are applied immediately. Only for answering availability queries: a day
+    can be up to the TTL out of date, so it never decides whether a booking
+    is accepted; the booking_no_overlap constraint does.
+    """
+
+    def __init__(self, ttl_seconds: int, max_days: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_days = max_days
+        self._days: "OrderedDict[Tuple[object, date], DayOccupancy]" = OrderedDict()
+        self._locks: Dict[Tuple[object, date], asyncio.Lock] = {}
+
+    def _fresh(self, key) -> Optional[DayOccupancy]:
+        day = self._days.get(key)
+        if day is None or _time.monotonic() - day.loaded_at > self.ttl_seconds:
+            return None
+        self._days.move_to_end(key)
+        return day
+
+    async def get_day(self, db: AsyncSession, venue_id, booking_date: date) -> DayOccupancy:
+        """Occupancy for a venue/date, loading it from the database if needed"""
+        key = (venue_id, booking_date)
+        day = self._fresh(key)
+        if day is not None:
+            return day
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another request may have loaded it while we waited
+            day = self._fresh(key)
+            if day is None:
+                day = await self._load(db, venue_id, booking_date)
+                self._days[key] = day
+                self._days.move_to_end(key)
+                while len(self._days) > self.max_days:
+                    self._days.popitem(last=False)
+        self._locks.pop(key, None)
+        return day
+
+    async def _load(self, db: AsyncSession, venue_id, booking_date: date) -> DayOccupancy:
+        # Include bookings from the previous day that run past midnight
+        result = await db.execute(
+            select(Booking.id, Booking.booking_date, Booking.start_time, Booking.end_time).where(
+                Booking.venue_id == venue_id,
+                Booking.status.notin_(INACTIVE_STATUSES),
+                or_(
+                    Booking.booking_date == booking_date,
+                    and_(
+                        Booking.booking_date == booking_date - timedelta(days=1),
+                        Booking.end_time <= Booking.start_time
+                    )
+                )
+            )
+        )
+        day = DayOccupancy()
+        for row in result:
+            for span_date, start, end in booking_spans(row.booking_date, row.start_time, row.end_time):
+                if span_date == booking_date:
+                    day.add(row.id, start, end)
+        return day
+
+    def add_booking(self, booking: Booking) -> None:
+        """Mark a newly created booking's minutes as taken in loaded days"""
+        for span_date, start, end in booking_spans(booking.booking_date, booking.start_time, booking.end_time):
+            day = self._days.get((booking.venue_id, span_date))
+            if day is not None:
+                day.add(booking.id, start, end)
+
+    def remove_booking(self, booking: Booking) -> None:
+        """Release a cancelled booking's minutes in loaded days"""
+        for span_date, _, _ in booking_spans(booking.booking_date, booking.start_time, booking.end_time):
+            day = self._days.get((booking.venue_id, span_date))
+            if day is not None:
+                day.remove(booking.id)
+
+    def invalidate(self, venue_id=None, booking_date: Optional[date] = None) -> None:
+        """Drop cached days for one venue (optionally one date), or for all venues"""
+        if venue_id is None:
+            self._days.clear()
+            return
+        for key in [key for key in self._days if key[0] == venue_id]:
+            if booking_date is None or key[1] == booking_date:
+                del self._days[key]
+
+availability_index = AvailabilityIndex(
+    ttl_seconds=settings.AVAILABILITY_TTL_SECONDS,
+    max_days=settings.AVAILABILITY_MAX_DAYS
+)
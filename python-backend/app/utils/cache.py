@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from .compression import CACHED_BODY_LEVELS, ENCODINGS, compress, negotiate_encoding, response_bytes
+from .responses import dumps
+
+logger = logging.getLogger(__name__)
+
+def serialize_json(payload: Any) -> bytes:
+    """Encode a response payload to compact JSON bytes"""
+    return dumps(payload)
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+class CachedBody:
+    """A pre-serialized JSON response body and its validators.
+
+    Compressed copies are made on first request for each encoding and kept
+    with the body, so an unchanged payload is never compressed twice.
+    """
+
+    __slots__ = ("body", "etag", "last_modified", "loaded_at", "_encoded")
+
+    def __init__(self, body: bytes, last_modified: Optional[datetime] = None):
+        self.body = body
+        self.etag = make_etag(body)
+        self.last_modified = http_datetime(last_modified) if last_modified else None
+        self.loaded_at = time.monotonic()
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        """The body compressed with gzip or br"""
+        data = self._encoded.get(encoding)
+        if data is None:
+            data = self._encoded[encoding] = compress(self.body, encoding, CACHED_BODY_LEVELS)
+        return data
+
+    def encoded_etag(self, encoding: str) -> str:
+        """ETag of a compressed copy; each representation needs its own"""
+        return f'{self.etag[:-1]}-{encoding}"'
+
+    def all_etags(self) -> Tuple[str, ...]:
+        """ETags of every representation: identity, then each encoding"""
+        return (self.etag,) + tuple(self.encoded_etag(encoding) for encoding in ENCODINGS)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """Evaluate an If-Modified-Since header against a Last-Modified time"""
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one second resolution
+    return last_modified.replace(microsecond=0) <= http_datetime(since)
+
+def http_datetime(value: datetime) -> datetime:
+    """Treat naive (UTC) timestamps from the database as UTC"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def cached_response(request: Request, entry: CachedBody, cache_control: str = "no-cache") -> Response:
+    """Serve a cached body, compressed if the client accepts it, answering 304 when the client already has it"""
+    encoding = None
+    if settings.COMPRESSION_ENABLED and len(entry.body) >= settings.COMPRESSION_MIN_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    etag = entry.encoded_etag(encoding) if encoding else entry.etag
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if entry.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(entry.last_modified, usegmt=True)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+        # Any representation the client holds is current, whichever
+        # encoding it was fetched with.
+        not_modified = any(etag_matches(if_none_match, candidate) for candidate in entry.all_etags())
+    else:
+        not_modified = not_modified_since(request.headers.get("if-modified-since"), entry.last_modified)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+    content = entry.encoded(encoding)
+    response_bytes.inc(len(entry.body), encoding="identity")
+    response_bytes.inc(len(content), encoding=encoding)
+    headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type="application/json", headers=headers)
+
+class CachedLookup:
+    """A single pre-serialized response kept in memory for ttl_seconds.
+
+    Concurrent misses share one load. If a reload fails the previous body
+    keeps being served.
+    """
+
+    def __init__(self, name: str, loader: Callable[[AsyncSession], Awaitable[CachedBody]], ttl_seconds: int):
+        self.name = name
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._entry: Optional[CachedBody] = None
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> Optional[CachedBody]:
+        entry = self._entry
+        if entry is not None and time.monotonic() - entry.loaded_at < self.ttl_seconds:
+            return entry
+        return None
+
+    async def get(self, db: AsyncSession) -> CachedBody:
+        entry = self._fresh()
+        if entry is not None:
+            return entry
+        async with self._lock:
+            entry = self._fresh()
+            if entry is not None:
+                return entry
+            try:
+                self._entry = await self.loader(db)
+            except Exception:
+                if self._entry is None:
+                    raise
+                logger.exception(f"Reloading {self.name} cache failed, serving stale copy")
+                self._entry.loaded_at = time.monotonic()
+            return self._entry
+
+    def invalidate(self) -> None:
+        self._entry = None
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after ttl_seconds"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
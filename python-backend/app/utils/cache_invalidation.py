@@ -0,0 +1,92 @@
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, List, Optional
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+class CacheInvalidator:
+    """Drops in-memory caches on demand, e.g. after edits made outside the API.
+
+    Each worker holds its own copy of the caches. With a redis_url the request
+    is published on a Redis channel every worker listens to, so all of them
+    reload; without one there is a single worker and it is applied directly.
+    """
+
+    CHANNEL = "cache_invalidation"
+    RETRY_SECONDS = 5.0
+
+    def __init__(self, redis_url: Optional[str]):
+        self.redis_url = redis_url
+        self._caches: Dict[str, Callable[[], None]] = {}
+        self._redis = None
+        self._task = None
+
+    def add(self, name: str, invalidate: Callable[[], None]) -> None:
+        """Register a cache under name; invalidate() must make it reload on next use"""
+        self._caches[name] = invalidate
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._caches)
+
+    def apply(self, names: List[str]) -> None:
+        """Invalidate the named caches in this process"""
+        for name in names:
+            invalidate = self._caches.get(name)
+            if invalidate is not None:
+                invalidate()
+        logger.info(f"Invalidated caches: {', '.join(names)}")
+
+    async def invalidate(self, names: List[str]) -> bool:
+        """Invalidate the named caches in every worker; False if only this one could be reached"""
+        self.apply(names)
+        if self._redis is None:
+            return self.redis_url is None
+        try:
+            await self._redis.publish(self.CHANNEL, json.dumps(names))
+        except Exception as e:
+            logger.warning(f"Could not broadcast cache invalidation: {e!r}")
+            return False
+        return True
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        # Includes our own broadcasts; invalidating twice is harmless
+                        self.apply(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener failed, retrying: {e!r}")
+                await asyncio.sleep(self.RETRY_SECONDS)
+
+    def start(self) -> None:
+        if self.redis_url is None or self._task is not None:
+            return
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("Invalidating caches across workers requires the redis package") from e
+        self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+# Broadcast through Redis whenever workers share state through it
+cache_invalidator = CacheInvalidator(
+    redis_url=settings.REDIS_URL if settings.shares_state_between_workers else None
+)
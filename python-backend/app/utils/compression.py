@@ -0,0 +1,170 @@
+import gzip
+import zlib
+from typing import Dict, NamedTuple, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from ..instrumentation import route_name
+from ..metrics import Counter
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip is offered
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+# In order of preference
+ENCODINGS = ("br", "gzip")
+
+response_bytes = Counter(
+    "http_response_bytes_total",
+    "Response body bytes before (identity) and after compression",
+    ["encoding"]
+)
+
+class CompressionLevels(NamedTuple):
+    gzip: int = 4  # 1-9
+    brotli: int = 3  # 0-11; each step up costs noticeably more CPU
+
+# Pre-serialized cached bodies are compressed once per change and then served
+# many times, so they get smaller output at a higher CPU cost. Brotli beyond 6
+# saves little on JSON and takes long enough (over 200 ms for a 70 KB catalog
+# at 11) to stall the event loop.
+CACHED_BODY_LEVELS = CompressionLevels(gzip=9, brotli=6)
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The encoding to use for a client's Accept-Encoding: br, gzip or None"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+    wildcard = weights.get("*", 0.0)
+    candidates = ENCODINGS if brotli is not None else ("gzip",)
+    best, best_weight = None, 0.0
+    for encoding in candidates:
+        weight = weights.get(encoding, wildcard)
+        # br is listed first, so it wins ties
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+def compress(body: bytes, encoding: str, levels: CompressionLevels) -> bytes:
+    """Compress a whole body with gzip or brotli"""
+    if encoding == "br":
+        return brotli.compress(body, quality=levels.brotli)
+    return gzip.compress(body, compresslevel=levels.gzip, mtime=0)
+
+def is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+class _StreamCompressor:
+    """Incremental gzip/brotli for responses sent in several chunks"""
+
+    def __init__(self, encoding: str, levels: CompressionLevels):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=levels.brotli)
+            self.compress, self.finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(levels.gzip, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+            self.compress, self.finish = compressor.compress, compressor.flush
+
+class CompressionMiddleware:
+    """Compresses response bodies with brotli or gzip, per Accept-Encoding.
+
+    Bodies under minimum_size, non-text types and responses that already have
+    a Content-Encoding (e.g. cached bodies compressed by cached_response) are
+    sent as they are. route_levels overrides the levels for individual route
+    templates. Written as plain ASGI middleware, like MetricsMiddleware, so
+    an uncompressed response is passed through untouched.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        levels: CompressionLevels = CompressionLevels(),
+        route_levels: Optional[Dict[str, CompressionLevels]] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = levels
+        self.route_levels = route_levels or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if status_code < 200 or status_code in (204, 304) or not is_compressible(Headers(raw=message["headers"])):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the body shows whether compressing is worthwhile
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            levels = self.route_levels.get(route_name(scope), self.levels)
+
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The bytes differ from the identity body the ETag names
+                    headers["etag"] = "W/" + etag
+                if not more_body:
+                    compressed = compress(body, encoding, levels)
+                    response_bytes.inc(len(body), encoding="identity")
+                    response_bytes.inc(len(compressed), encoding=encoding)
+                    headers["content-length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                del headers["content-length"]
+                await send(start_message)
+                compressor = _StreamCompressor(encoding, levels)
+
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            response_bytes.inc(len(body), encoding="identity")
+            response_bytes.inc(len(chunk), encoding=encoding)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
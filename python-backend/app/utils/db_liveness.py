@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from typing import Dict
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+from ..config import settings
+from ..database import async_engine, replica_engine
+from ..metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+database_up = Gauge(
+    "db_up",
+    "1 if the last background liveness check reached the database",
+    ["database"]
+)
+stale_connections = Counter(
+    "db_stale_connections_total",
+    "Pooled connections the liveness check found dead",
+    ["database"]
+)
+
+class LivenessChecker:
+    """Checks pooled connections in the background instead of on every checkout.
+
+    Each round pings every idle connection once. A dead one makes SQLAlchemy
+    invalidate the whole pool, so requests get fresh connections instead of
+    hitting the broken ones.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.engines: Dict[str, AsyncEngine] = {}
+        self.up: Dict[str, bool] = {}
+        self._task = None
+
+    def watch(self, name: str, engine: AsyncEngine) -> None:
+        self.engines[name] = engine
+
+    async def _ping(self, engine: AsyncEngine) -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def check(self, name: str, engine: AsyncEngine) -> bool:
+        """Ping the engine's idle connections and record whether the database answered"""
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            if pool.checkedin() == 0 and pool.checkedout() > 0:
+                # Every connection is busy serving requests, which is proof enough
+                return True
+            # Idle connections are handed out oldest first, so this visits each one
+            rounds = max(pool.checkedin(), 1)
+        else:
+            rounds = 1
+
+        timeout = max(1.0, self.interval_seconds)
+        try:
+            for _ in range(rounds):
+                await asyncio.wait_for(self._ping(engine), timeout=timeout)
+            ok = True
+        except Exception as e:
+            stale_connections.inc(database=name)
+            # The pool was just invalidated, so this opens a new connection
+            # and tells a dead connection apart from a dead server
+            try:
+                await asyncio.wait_for(self._ping(engine), timeout=timeout)
+                ok = True
+            except Exception:
+                ok = False
+                if self.up.get(name, True):
+                    logger.warning(f"Database liveness check failed for {name}: {e!r}")
+        if ok and not self.up.get(name, True):
+            logger.info(f"Database {name} is reachable again")
+        self.up[name] = ok
+        database_up.set(1 if ok else 0, database=name)
+        return ok
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            for name, engine in self.engines.items():
+                await self.check(name, engine)
+
+    def start(self) -> None:
+        if self.interval_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+liveness_checker = LivenessChecker(interval_seconds=settings.DB_LIVENESS_CHECK_SECONDS)
+liveness_checker.watch("primary", async_engine)
+if replica_engine is not None:
+    liveness_checker.watch("replica", replica_engine)
@@ -0,0 +1,72 @@
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+class GeoGrid:
+    """Points bucketed into fixed lat/lng cells for radius searches.
+
+    A search only looks at the cells overlapping the radius' bounding box,
+    then filters by exact distance, so its cost follows the number of nearby
+    points rather than the size of the catalog.
+    """
+
+    def __init__(self, cell_degrees: float = 0.1):
+        self.cell_degrees = cell_degrees
+        self.columns = math.ceil(360 / cell_degrees)
+        self.cells: Dict[Tuple[int, int], List[Tuple[float, float, object]]] = defaultdict(list)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor((lng + 180) / self.cell_degrees) % self.columns
+
+    def add(self, lat: float, lng: float, item: object) -> None:
+        self.cells[self._cell(lat, lng)].append((lat, lng, item))
+
+    def within(self, lat: float, lng: float, radius_km: float) -> List[Tuple[float, object]]:
+        """(distance_km, item) for every point within radius_km, in no particular order"""
+        d_lat = radius_km / KM_PER_DEGREE
+        first_row, _ = self._cell(max(-90.0, lat - d_lat), lng)
+        last_row, _ = self._cell(min(90.0, lat + d_lat), lng)
+
+        if abs(lat) + d_lat >= 90:
+            # The circle reaches over a pole, where every longitude is close
+            columns = range(self.columns)
+        else:
+            # Longitude degrees shrink towards the poles, so widen by the worst row
+            d_lng = radius_km / (KM_PER_DEGREE * math.cos(math.radians(abs(lat) + d_lat)))
+            span = math.ceil(2 * d_lng / self.cell_degrees) + 1
+            first_column = self._cell(lat, lng - d_lng)[1]
+            columns = range(self.columns) if span >= self.columns else [
+                (first_column + i) % self.columns for i in range(span)
+            ]
+
+        found = []
+        for row in range(first_row, last_row + 1):
+            for column in columns:
+                for point_lat, point_lng, item in self.cells.get((row, column), ()):
+                    distance = haversine_km(lat, lng, point_lat, point_lng)
+                    if distance <= radius_km:
+                        found.append((distance, item))
+        return found
+
+    @classmethod
+    def build(cls, points: Iterable[Tuple[Optional[float], Optional[float], object]], cell_degrees: float = 0.1) -> "GeoGrid":
+        """Grid of the points that have both coordinates"""
+        grid = cls(cell_degrees)
+        for lat, lng, item in points:
+            if lat is not None and lng is not None:
+                grid.add(lat, lng, item)
+        return grid
+
+    def __len__(self) -> int:
+        return sum(len(points) for points in self.cells.values())
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+from fastapi import HTTPException, status
+from ..config import settings
+from ..metrics import Counter, Gauge, Histogram
+
+T = TypeVar("T")
+
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+hash_queue_wait = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time password hashing jobs waited for a worker thread",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+hash_duration = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying a password",
+    ["operation"],
+    buckets=HASH_BUCKETS
+)
+hash_pending = Gauge(
+    "password_hash_pending",
+    "Password hashing jobs queued or running"
+)
+hash_rejected = Counter(
+    "password_hash_rejected_total",
+    "Password hashing jobs rejected because the queue was full",
+    ["operation"]
+)
+
+class HashingPool:
+    """Runs bcrypt on a small dedicated thread pool off the event loop.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism.
+    At most max_workers jobs run at once; once max_queue more are waiting,
+    new jobs are rejected with 503 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+
+    async def run(self, operation: str, func: Callable[..., T], *args) -> T:
+        if self.pending >= self.max_workers + self.max_queue:
+            hash_rejected.inc(operation=operation)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted = time.perf_counter()
+
+        def job() -> T:
+            started = time.perf_counter()
+            hash_queue_wait.observe(started - submitted, operation=operation)
+            try:
+                return func(*args)
+            finally:
+                hash_duration.observe(time.perf_counter() - started, operation=operation)
+
+        self.pending += 1
+        hash_pending.inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            self.pending -= 1
+            hash_pending.dec()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+hashing_pool = HashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
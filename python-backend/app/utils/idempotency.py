@@ -0,0 +1,268 @@
+import asyncio
+import base64
+import hashlib
+import json
+from typing import Callable, Coroutine, List, Optional, Tuple
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from ..config import settings
+from ..metrics import Counter
+from .cache import TTLCache
+from .responses import dumps
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+idempotent_replays = Counter(
+    "idempotent_replays_total",
+    "POST requests answered from the idempotency store instead of running again"
+)
+
+class StoredResponse:
+    """Outcome of the first request made with an Idempotency-Key.
+
+    ready is set once the request has finished; status_code stays None when
+    its outcome was not worth keeping (a server error), so a retry runs again.
+    """
+
+    __slots__ = ("fingerprint", "ready", "status_code", "headers", "body")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.ready = asyncio.Event()
+        self.status_code: Optional[int] = None
+        self.headers: List[Tuple[bytes, bytes]] = []
+        self.body = b""
+
+    def replay(self) -> Response:
+        response = Response(content=self.body, status_code=self.status_code)
+        response.raw_headers = self.headers + [(b"idempotent-replayed", b"true")]
+        return response
+
+def is_cacheable(status_code: int) -> bool:
+    """Keep successes and client errors; server errors and rate limits are worth retrying"""
+    return status_code < 500 and status_code != status.HTTP_429_TOO_MANY_REQUESTS
+
+class IdempotencyStore:
+    """Bounded map of (caller, Idempotency-Key) to the response first given for it.
+
+    A retry with the same key and the same request gets the stored response
+    back without running the route again; one that arrives while the first is
+    still running waits for it. Reusing a key for a different request is a 422.
+    Entries live in this process only, so it is only valid with a single
+    worker process; RedisIdempotencyStore shares them between workers.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, wait_seconds: float):
+        self.wait_seconds = wait_seconds
+        self._entries = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def caller(request: Request) -> str:
+        """Who the key belongs to: the bearer token if any, else the client address"""
+        authorization = request.headers.get("authorization")
+        if authorization:
+            return hashlib.sha256(authorization.encode()).hexdigest()
+        return request.client.host if request.client else "unknown"
+
+    @staticmethod
+    def fingerprint(request: Request, body: bytes) -> str:
+        digest = hashlib.sha256(request.method.encode())
+        digest.update(request.url.path.encode())
+        digest.update(body)
+        return digest.hexdigest()
+
+    @staticmethod
+    def check_key(key: str) -> None:
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"
+            )
+
+    @staticmethod
+    def different_request() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_HEADER} was already used for a different request"
+        )
+
+    @staticmethod
+    def still_running() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed",
+            headers={"Retry-After": "1"}
+        )
+
+    @staticmethod
+    def record(entry: StoredResponse, response: Optional[Response] = None, error: Optional[HTTPException] = None) -> None:
+        """Copy a replayable outcome into entry; server errors are left out"""
+        if error is not None:
+            if is_cacheable(error.status_code):
+                entry.status_code = error.status_code
+                entry.body = dumps({"detail": error.detail})
+                entry.headers = [(b"content-type", b"application/json")] + [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in (error.headers or {}).items()
+                ]
+        elif is_cacheable(response.status_code) and hasattr(response, "body"):
+            entry.status_code = response.status_code
+            entry.headers = list(response.raw_headers)
+            entry.body = response.body
+
+    async def run(self, request: Request, key: str, handler: Callable[[Request], Coroutine]) -> Response:
+        self.check_key(key)
+        scope = (self.caller(request), key)
+        fingerprint = self.fingerprint(request, await request.body())
+
+        entry: Optional[StoredResponse] = self._entries.get(scope)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise self.different_request()
+            if not entry.ready.is_set():
+                try:
+                    await asyncio.wait_for(entry.ready.wait(), self.wait_seconds)
+                except asyncio.TimeoutError:
+                    raise self.still_running()
+            if entry.status_code is not None:
+                idempotent_replays.inc()
+                return entry.replay()
+
+        entry = StoredResponse(fingerprint)
+        self._entries.set(scope, entry)
+        try:
+            response = await handler(request)
+        except HTTPException as e:
+            self.record(entry, error=e)
+            self._finish(scope, entry)
+            raise
+        except BaseException:
+            self._finish(scope, entry)
+            raise
+
+        self.record(entry, response)
+        self._finish(scope, entry)
+        return response
+
+    def _finish(self, scope: Tuple[str, str], entry: StoredResponse) -> None:
+        if entry.status_code is None and self._entries.get(scope) is entry:
+            # Nothing to replay; let the next attempt run from scratch
+            self._entries.pop(scope)
+        entry.ready.set()
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """Idempotency entries in Redis, so a retry is recognised by every worker.
+
+    The first request claims the key with SET NX; others with the same key
+    poll until the stored outcome appears (or the claim is dropped because
+    the first attempt failed, in which case they claim it themselves).
+    """
+
+    KEY_PREFIX = "idempotency:"
+    POLL_SECONDS = 0.1
+
+    def __init__(self, url: str, ttl_seconds: float, wait_seconds: float):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("IDEMPOTENCY_STORE_BACKEND=redis requires the redis package") from e
+        self._redis = redis.from_url(url)
+        self.ttl_seconds = max(1, int(ttl_seconds))
+        self.wait_seconds = wait_seconds
+
+    def _key(self, scope: Tuple[str, str]) -> str:
+        return self.KEY_PREFIX + hashlib.sha256("\n".join(scope).encode()).hexdigest()
+
+    @staticmethod
+    def _dump(entry: StoredResponse) -> str:
+        return json.dumps({
+            "fingerprint": entry.fingerprint,
+            "status_code": entry.status_code,
+            "headers": [[base64.b64encode(name).decode(), base64.b64encode(value).decode()] for name, value in entry.headers],
+            "body": base64.b64encode(entry.body).decode()
+        })
+
+    @staticmethod
+    def _load(raw: bytes) -> StoredResponse:
+        data = json.loads(raw)
+        entry = StoredResponse(data["fingerprint"])
+        entry.status_code = data["status_code"]
+        entry.headers = [(base64.b64decode(name), base64.b64decode(value)) for name, value in data["headers"]]
+        entry.body = base64.b64decode(data["body"])
+        return entry
+
+    async def run(self, request: Request, key: str, handler: Callable[[Request], Coroutine]) -> Response:
+        self.check_key(key)
+        redis_key = self._key((self.caller(request), key))
+        fingerprint = self.fingerprint(request, await request.body())
+        entry = StoredResponse(fingerprint)
+
+        deadline = asyncio.get_running_loop().time() + self.wait_seconds
+        # A pending claim has no status_code yet
+        while not await self._redis.set(redis_key, self._dump(entry), nx=True, ex=self.ttl_seconds):
+            raw = await self._redis.get(redis_key)
+            if raw is None:
+                continue  # the first attempt gave up its claim; try to take it
+            stored = self._load(raw)
+            if stored.fingerprint != fingerprint:
+                raise self.different_request()
+            if stored.status_code is not None:
+                idempotent_replays.inc()
+                return stored.replay()
+            if asyncio.get_running_loop().time() >= deadline:
+                raise self.still_running()
+            await asyncio.sleep(self.POLL_SECONDS)
+
+        try:
+            response = await handler(request)
+        except HTTPException as e:
+            self.record(entry, error=e)
+            await self._finish_claim(redis_key, entry)
+            raise
+        except BaseException:
+            await self._finish_claim(redis_key, entry)
+            raise
+
+        self.record(entry, response)
+        await self._finish_claim(redis_key, entry)
+        return response
+
+    async def _finish_claim(self, redis_key: str, entry: StoredResponse) -> None:
+        if entry.status_code is None:
+            # Nothing to replay; let the next attempt run from scratch
+            await self._redis.delete(redis_key)
+        else:
+            await self._redis.set(redis_key, self._dump(entry), ex=self.ttl_seconds)
+
+def create_idempotency_store(backend: str, redis_url: Optional[str], maxsize: int, ttl_seconds: float, wait_seconds: float) -> IdempotencyStore:
+    """Build the idempotency store selected in settings"""
+    if backend == "memory":
+        return IdempotencyStore(maxsize=maxsize, ttl_seconds=ttl_seconds, wait_seconds=wait_seconds)
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("IDEMPOTENCY_STORE_BACKEND=redis requires REDIS_URL")
+        return RedisIdempotencyStore(redis_url, ttl_seconds=ttl_seconds, wait_seconds=wait_seconds)
+    raise ValueError(f"Unknown IDEMPOTENCY_STORE_BACKEND {backend!r}, expected 'memory' or 'redis'")
+
+idempotency_store = create_idempotency_store(
+    backend=settings.IDEMPOTENCY_STORE_BACKEND,
+    redis_url=settings.REDIS_URL,
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS
+)
+
+class IdempotentRoute(APIRoute):
+    """Route class that honors the Idempotency-Key header on POST requests"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine]:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key or request.method != "POST":
+                return await handler(request)
+            return await idempotency_store.run(request, key, handler)
+
+        return idempotent_handler
@@ -0,0 +1,64 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Tuple, Type
+
+class TokenBackend(ABC):
+    """Encodes and verifies JWTs with key material prepared once"""
+
+    # Exceptions raised by decode for bad, tampered or expired tokens
+    errors: Tuple[Type[Exception], ...] = ()
+
+    @abstractmethod
+    def encode(self, claims: Dict[str, Any]) -> str:
+        ...
+
+    @abstractmethod
+    def decode(self, token: str) -> Dict[str, Any]:
+        ...
+
+class JoseBackend(TokenBackend):
+    """python-jose; passing a prebuilt Key skips per-call key parsing"""
+
+    def __init__(self, secret: str, algorithm: str):
+        from jose import JWTError, jwk, jwt
+        self._jwt = jwt
+        self.algorithm = algorithm
+        self.key = jwk.construct(secret, algorithm)
+        self.errors = (JWTError,)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return self._jwt.encode(claims, self.key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        return self._jwt.decode(token, self.key, algorithms=[self.algorithm])
+
+class PyJWTBackend(TokenBackend):
+    """PyJWT, roughly twice as fast as python-jose for HMAC tokens"""
+
+    def __init__(self, secret: str, algorithm: str):
+        try:
+            import jwt
+        except ImportError as e:
+            raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package") from e
+        self._jwt = jwt
+        self.algorithm = algorithm
+        self.key = jwt.algorithms.get_default_algorithms()[algorithm].prepare_key(secret)
+        self.errors = (jwt.PyJWTError,)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return self._jwt.encode(claims, self.key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        return self._jwt.decode(token, self.key, algorithms=[self.algorithm])
+
+BACKENDS = {
+    "jose": JoseBackend,
+    "pyjwt": PyJWTBackend,
+}
+
+def create_token_backend(name: str, secret: str, algorithm: str) -> TokenBackend:
+    """Build the JWT backend selected in settings"""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown JWT_BACKEND {name!r}, expected one of: {', '.join(BACKENDS)}")
+    return backend_class(secret, algorithm)
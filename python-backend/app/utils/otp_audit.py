@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import insert, update
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.otp import OTPVerification
+
+logger = logging.getLogger(__name__)
+
+class OTPAuditLog:
+    """Writes OTP history to otp_verifications in the background.
+
+    Requests only enqueue events; a single writer task drains the queue and
+    writes each batch in one transaction. The queue is bounded, and when the
+    database falls behind new events are dropped rather than slowing logins.
+    """
+
+    def __init__(self, enabled: bool, max_queue: int = 10000, batch_size: int = 200):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self._queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+
+    def _enqueue(self, event: dict) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("OTP audit queue full, dropping %s event", event["kind"])
+
+    def record_sent(self, phone_number: str, country_code: str, otp_code: str, expires_at: datetime,
+                    ip_address: Optional[str], user_agent: Optional[str]) -> None:
+        self._enqueue({
+            "kind": "sent",
+            "row": {
+                "id": uuid.uuid4(),
+                "phone_number": phone_number,
+                "country_code": country_code,
+                "otp_code": otp_code,
+                "is_verified": False,
+                "attempts": 0,
+                "max_attempts": settings.OTP_MAX_ATTEMPTS,
+                "expires_at": expires_at,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "created_at": datetime.utcnow(),
+            },
+        })
+
+    def record_verified(self, phone_number: str, attempts: int) -> None:
+        self._enqueue({
+            "kind": "verified",
+            "phone_number": phone_number,
+            "attempts": attempts,
+            "verified_at": datetime.utcnow(),
+        })
+
+    async def _write(self, events: List[dict]) -> None:
+        rows = [event["row"] for event in events if event["kind"] == "sent"]
+        async with AsyncSessionLocal() as session:
+            if rows:
+                await session.execute(insert(OTPVerification), rows)
+            for event in events:
+                if event["kind"] == "verified":
+                    await session.execute(
+                        update(OTPVerification)
+                        .where(
+                            OTPVerification.phone_number == event["phone_number"],
+                            OTPVerification.is_verified == False
+                        )
+                        .values(is_verified=True, verified_at=event["verified_at"], attempts=event["attempts"])
+                    )
+            await session.commit()
+
+    async def _drain(self) -> None:
+        while True:
+            events = [await self._queue.get()]
+            while len(events) < self.batch_size and not self._queue.empty():
+                events.append(self._queue.get_nowait())
+            try:
+                await self._write(events)
+            except Exception as e:
+                logger.error(f"Failed to write {len(events)} OTP audit events: {e}")
+            finally:
+                for _ in events:
+                    self._queue.task_done()
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._drain())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Flush what is queued, then stop the writer"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Gave up flushing %d OTP audit events", self._queue.qsize())
+        self._task.cancel()
+        self._task = None
+
+otp_audit_log = OTPAuditLog(enabled=settings.OTP_AUDIT_ENABLED)
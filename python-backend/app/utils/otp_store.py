@@ -0,0 +1,169 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Literal, Optional, Tuple
+from ..config import settings
+from .cache import TTLCache
+
+class OTPRecord:
+    """An issued OTP code and its verification state"""
+
+    __slots__ = ("phone_number", "country_code", "otp_code", "attempts", "max_attempts", "expires_at")
+
+    def __init__(self, phone_number: str, country_code: str, otp_code: str, expires_at: float, attempts: int = 0, max_attempts: int = 3):
+        self.phone_number = phone_number
+        self.country_code = country_code
+        self.otp_code = otp_code
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        self.expires_at = expires_at  # unix timestamp
+
+# What verify found: no pending code, too many wrong guesses already, a wrong
+# guess (now counted), or the right code (now used up)
+VerifyOutcome = Literal["missing", "locked", "wrong", "verified"]
+
+class OTPStore(ABC):
+    """Where pending OTP codes live until they are verified or expire"""
+
+    @abstractmethod
+    async def put(self, record: OTPRecord) -> None:
+        """Store a code, replacing any pending code for the same phone number"""
+
+    @abstractmethod
+    async def get(self, phone_number: str) -> Optional[OTPRecord]:
+        """The pending, unexpired code for a phone number, if any"""
+
+    @abstractmethod
+    async def verify(self, phone_number: str, otp_code: str) -> Tuple[VerifyOutcome, Optional[OTPRecord]]:
+        """Check a guess against the pending code in one atomic step.
+
+        A wrong guess is counted; the right one deletes the code, which is
+        returned. Concurrent guesses can never get past max_attempts.
+        """
+
+    @abstractmethod
+    async def delete(self, phone_number: str) -> None:
+        """Forget a code once it has been used"""
+
+class InMemoryOTPStore(OTPStore):
+    """Codes held in this process; only valid with a single worker process"""
+
+    def __init__(self, maxsize: int):
+        self._records = TTLCache(maxsize=maxsize, ttl_seconds=0)
+
+    async def put(self, record: OTPRecord) -> None:
+        self._records.set(record.phone_number, record, ttl_seconds=record.expires_at - time.time())
+
+    async def get(self, phone_number: str) -> Optional[OTPRecord]:
+        return self._records.get(phone_number)
+
+    async def verify(self, phone_number: str, otp_code: str) -> Tuple[VerifyOutcome, Optional[OTPRecord]]:
+        # No await in here, so nothing else runs between check and update
+        record = self._records.get(phone_number)
+        if record is None:
+            return "missing", None
+        if record.attempts >= record.max_attempts:
+            return "locked", record
+        if record.otp_code != otp_code:
+            record.attempts += 1
+            return "wrong", record
+        self._records.pop(phone_number)
+        return "verified", record
+
+    async def delete(self, phone_number: str) -> None:
+        self._records.pop(phone_number)
+
+# Check, compare and count or consume in one step. A key that expired or
+# was deleted is never written to, so no half-filled hash is left behind.
+VERIFY_CODE = """
+local data = redis.call('HMGET', KEYS[1], 'otp_code', 'attempts', 'max_attempts', 'country_code', 'expires_at')
+if not data[1] then
+    return {'missing'}
+end
+if tonumber(data[2]) >= tonumber(data[3]) then
+    return {'locked'}
+end
+if data[1] ~= ARGV[1] then
+    redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+    return {'wrong'}
+end
+redis.call('DEL', KEYS[1])
+return {'verified', data[4], data[5], data[2], data[3]}
+"""
+
+class RedisOTPStore(OTPStore):
+    """Codes held in Redis (or anything speaking its protocol), shared by all workers"""
+
+    KEY_PREFIX = "otp:"
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("OTP_STORE_BACKEND=redis requires the redis package") from e
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._verify_code = self._redis.register_script(VERIFY_CODE)
+
+    def _key(self, phone_number: str) -> str:
+        return self.KEY_PREFIX + phone_number
+
+    async def put(self, record: OTPRecord) -> None:
+        key = self._key(record.phone_number)
+        ttl = max(1, int(record.expires_at - time.time()))
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={
+                "country_code": record.country_code,
+                "otp_code": record.otp_code,
+                "attempts": record.attempts,
+                "max_attempts": record.max_attempts,
+                "expires_at": record.expires_at,
+            })
+            pipe.expire(key, ttl)
+            await pipe.execute()
+
+    async def get(self, phone_number: str) -> Optional[OTPRecord]:
+        data = await self._redis.hgetall(self._key(phone_number))
+        if "otp_code" not in data:
+            return None
+        return OTPRecord(
+            phone_number=phone_number,
+            country_code=data["country_code"],
+            otp_code=data["otp_code"],
+            expires_at=float(data["expires_at"]),
+            attempts=int(data["attempts"]),
+            max_attempts=int(data["max_attempts"]),
+        )
+
+    async def verify(self, phone_number: str, otp_code: str) -> Tuple[VerifyOutcome, Optional[OTPRecord]]:
+        result = await self._verify_code(keys=[self._key(phone_number)], args=[otp_code])
+        outcome = result[0]
+        if outcome != "verified":
+            return outcome, None
+        country_code, expires_at, attempts, max_attempts = result[1:]
+        return outcome, OTPRecord(
+            phone_number=phone_number,
+            country_code=country_code,
+            otp_code=otp_code,
+            expires_at=float(expires_at),
+            attempts=int(attempts),
+            max_attempts=int(max_attempts),
+        )
+
+    async def delete(self, phone_number: str) -> None:
+        await self._redis.delete(self._key(phone_number))
+
+def create_otp_store(backend: str, redis_url: Optional[str], maxsize: int) -> OTPStore:
+    """Build the OTP store selected in settings"""
+    if backend == "memory":
+        return InMemoryOTPStore(maxsize=maxsize)
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("OTP_STORE_BACKEND=redis requires REDIS_URL")
+        return RedisOTPStore(redis_url)
+    raise ValueError(f"Unknown OTP_STORE_BACKEND {backend!r}, expected 'memory' or 'redis'")
+
+otp_store = create_otp_store(
+    backend=settings.OTP_STORE_BACKEND,
+    redis_url=settings.REDIS_URL,
+    maxsize=settings.OTP_STORE_MAX_SIZE
+)
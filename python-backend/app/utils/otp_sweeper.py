@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.otp import OTPVerification
+from ..metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+otp_rows_swept = Counter(
+    "otp_rows_swept_total",
+    "Expired otp_verifications rows deleted by the sweeper"
+)
+
+class OTPSweeper:
+    """Periodically deletes otp_verifications rows past the retention window.
+
+    Rows are deleted in small batches, each in its own short transaction, so
+    the sweep never holds long locks or builds a large WAL burst. SKIP LOCKED
+    lets several workers sweep at once without waiting on each other.
+    """
+
+    def __init__(self, interval_seconds: float, retention_hours: float, batch_size: int, max_batches: int = 100):
+        self.interval_seconds = interval_seconds
+        self.retention = timedelta(hours=retention_hours)
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._task = None
+
+    async def sweep(self) -> int:
+        """Delete expired rows, up to max_batches batches; returns rows deleted"""
+        cutoff = datetime.utcnow() - self.retention
+        total = 0
+        for _ in range(self.max_batches):
+            batch = (
+                select(OTPVerification.id)
+                .where(OTPVerification.expires_at < cutoff)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    delete(OTPVerification).where(OTPVerification.id.in_(batch.scalar_subquery()))
+                )
+                await session.commit()
+            total += result.rowcount
+            if result.rowcount < self.batch_size:
+                break
+            # Give other queries a turn between batches
+            await asyncio.sleep(0)
+        if total:
+            otp_rows_swept.inc(total)
+            logger.info(f"Swept {total} expired OTP rows")
+        return total
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"OTP sweep failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self.interval_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+otp_sweeper = OTPSweeper(
+    interval_seconds=settings.OTP_SWEEP_INTERVAL_SECONDS,
+    retention_hours=settings.OTP_RETENTION_HOURS,
+    batch_size=settings.OTP_SWEEP_BATCH_SIZE
+)
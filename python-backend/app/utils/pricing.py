@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time as _time
+import uuid
+from array import array
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..models.venue import VenuePriceRule
+from .availability import MINUTES_PER_DAY, booking_spans, range_mask, time_to_minute
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRICE_PER_HOUR = Decimal("800.00")
+CENT = Decimal("0.01")
+
+def legacy_price_per_hour(prices: Optional[str]) -> Decimal:
+    """Hourly price from a venue's free-text prices field, 800 when it is not a plain number"""
+    if prices and prices.strip().replace('.', '', 1).isdigit():
+        return Decimal(prices.strip())
+    return DEFAULT_PRICE_PER_HOUR
+
+def _cents(amount: Decimal) -> int:
+    return int((amount * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+def _rule_spans(day: int, start: int, end: int) -> List[Tuple[int, int, int]]:
+    """(weekday, start_minute, end_minute) spans covered by a band starting on day"""
+    if end > start:
+        return [(day, start, end)]
+    spans = [(day, start, MINUTES_PER_DAY)]
+    if end > 0:
+        spans.append(((day + 1) % 7, 0, end))
+    return spans
+
+class PriceQuote:
+    __slots__ = ("total_amount", "price_per_hour", "is_peak")
+
+    def __init__(self, total_amount: Decimal, price_per_hour: Decimal, is_peak: bool):
+        self.total_amount = total_amount
+        self.price_per_hour = price_per_hour
+        self.is_peak = is_peak
+
+class PriceTable:
+    """Compiled prices of one venue: per weekday, a prefix sum of the per-minute rate.
+
+    The price of any slot is then two array lookups per day it touches,
+    whatever the number of rules. Weekdays without any rule keep no array and
+    are priced at the flat fallback rate; weekdays with identical prices share
+    one array.
+    """
+
+    __slots__ = ("fallback_cents", "days", "peak")
+
+    def __init__(self, fallback_cents: int, days: Sequence[Optional[array]], peak: Sequence[int]):
+        self.fallback_cents = fallback_cents
+        self.days = days
+        self.peak = peak
+
+    def quote(self, booking_date: date, start_time: time, duration_minutes: int) -> PriceQuote:
+        if not 0 < duration_minutes < MINUTES_PER_DAY:
+            # Zero would divide by zero below and a negative length gives a negative price
+            raise ValueError(f"duration_minutes must be between 1 and {MINUTES_PER_DAY - 1}, got {duration_minutes}")
+        end_time = (datetime.combine(booking_date, start_time) + timedelta(minutes=duration_minutes)).time()
+        # Sum of hourly rates in cents over the minutes booked
+        cent_minutes = 0
+        is_peak = False
+        for span_date, start, end in booking_spans(booking_date, start_time, end_time):
+            weekday = span_date.weekday()
+            prefix = self.days[weekday]
+            if prefix is None:
+                cent_minutes += self.fallback_cents * (end - start)
+            else:
+                cent_minutes += prefix[end] - prefix[start]
+            is_peak = is_peak or bool(self.peak[weekday] & range_mask(start, end))
+        total = (Decimal(cent_minutes) / 6000).quantize(CENT, rounding=ROUND_HALF_UP)
+        per_hour = (Decimal(cent_minutes) / 100 / duration_minutes).quantize(CENT, rounding=ROUND_HALF_UP)
+        return PriceQuote(total, per_hour, is_peak)
+
+def compile_price_table(rules: Sequence[VenuePriceRule], fallback: Decimal) -> PriceTable:
+    """Paint each rule's band onto a per-minute rate table and take prefix sums"""
+    fallback_cents = _cents(fallback)
+    if not rules:
+        return PriceTable(fallback_cents, [None] * 7, [0] * 7)
+
+    rates: List[Optional[List[int]]] = [None] * 7
+    peak = [0] * 7
+    # Every-day rules first, then weekday rules, lowest priority first: later paint wins
+    for rule in sorted(rules, key=lambda rule: (rule.day_of_week is not None, rule.priority)):
+        cents = _cents(Decimal(rule.price_per_hour))
+        days = range(7) if rule.day_of_week is None else [rule.day_of_week]
+        for first_day in days:
+            for day, start, end in _rule_spans(first_day, time_to_minute(rule.start_time), time_to_minute(rule.end_time)):
+                if rates[day] is None:
+                    rates[day] = [fallback_cents] * MINUTES_PER_DAY
+                rates[day][start:end] = [cents] * (end - start)
+                mask = range_mask(start, end)
+                peak[day] = peak[day] | mask if rule.is_peak else peak[day] & ~mask
+
+    shared: Dict[Tuple[int, ...], array] = {}
+    days: List[Optional[array]] = []
+    for day_rates in rates:
+        if day_rates is None:
+            days.append(None)
+            continue
+        key = tuple(day_rates)
+        if key not in shared:
+            shared[key] = array("q", accumulate(day_rates, initial=0))
+        days.append(shared[key])
+    return PriceTable(fallback_cents, days, peak)
+
+class PriceBook:
+    """Price rules of every venue, compiled into price tables on first use.
+
+    Like the venue catalog, a cheap fingerprint query (row count and latest
+    updated_at) runs at most once per check interval, and the rules are only
+    reloaded when it changes.
+    """
+
+    def __init__(self, check_interval_seconds: int):
+        self.check_interval_seconds = check_interval_seconds
+        self._rules: Dict[uuid.UUID, List[VenuePriceRule]] = {}
+        self._tables: Dict[uuid.UUID, Tuple[Optional[str], PriceTable]] = {}
+        self._fingerprint: Optional[Tuple] = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _due(self) -> bool:
+        return not self._loaded or _time.monotonic() - self._checked_at >= self.check_interval_seconds
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Reload the rules if venue_price_rules changed since the last check"""
+        if not self._due():
+            return
+        async with self._lock:
+            if not self._due():
+                return
+            try:
+                result = await db.execute(
+                    select(func.count(VenuePriceRule.id), func.max(VenuePriceRule.updated_at))
+                )
+                fingerprint = tuple(result.one())
+                if fingerprint != self._fingerprint or not self._loaded:
+                    result = await db.execute(select(VenuePriceRule))
+                    rules = defaultdict(list)
+                    for rule in result.scalars().all():
+                        rules[rule.venue_id].append(rule)
+                    self._rules = dict(rules)
+                    self._tables = {}
+                    self._fingerprint = fingerprint
+                    self._loaded = True
+                    logger.info(f"Price rules loaded for {len(self._rules)} venues")
+            except Exception:
+                if not self._loaded:
+                    raise
+                logger.exception("Refreshing price rules failed, serving stale copy")
+            self._checked_at = _time.monotonic()
+
+    def table_for(self, venue) -> PriceTable:
+        """Compiled price table for a venue (anything with id and prices)"""
+        cached = self._tables.get(venue.id)
+        # The fallback rate comes from the venue row, so recompile when it changes
+        if cached is None or cached[0] != venue.prices:
+            table = compile_price_table(self._rules.get(venue.id, []), legacy_price_per_hour(venue.prices))
+            cached = (venue.prices, table)
+            self._tables[venue.id] = cached
+        return cached[1]
+
+    def invalidate(self) -> None:
+        """Force a reload on the next request"""
+        self._loaded = False
+        self._fingerprint = None
+
+price_book = PriceBook(check_interval_seconds=settings.VENUE_CATALOG_CHECK_SECONDS)
@@ -0,0 +1,97 @@
+import math
+import time
+from typing import Optional
+from fastapi import HTTPException, status
+from .cache import TTLCache
+
+class TokenBucketLimiter:
+    """Per-key token buckets: bursts up to capacity, refilled at a steady rate.
+
+    Buckets live in this process, so with several workers each enforces the
+    limit on its own. Idle buckets are dropped once they would have refilled
+    completely, so memory stays bounded by the number of recently active keys.
+    """
+
+    def __init__(self, capacity: float, refill_per_minute: float, maxsize: int = 100000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_minute / 60.0
+        self._buckets = TTLCache(maxsize=maxsize, ttl_seconds=capacity / self.refill_per_second)
+
+    async def acquire(self, key: str) -> float:
+        """Take one token for key; returns 0 on success, else seconds until one is available"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = self.capacity
+        else:
+            tokens, updated = bucket
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / self.refill_per_second
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+    async def check(self, key: str, detail: str = "Too many requests, please try again later") -> None:
+        """Take one token for key or raise 429"""
+        retry_after = await self.acquire(key)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=detail,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+# Refill, take a token and store the bucket in one step, so concurrent
+# requests on different workers cannot spend the same token
+TAKE_TOKEN = """
+local capacity = tonumber(ARGV[1])
+local refill_per_second = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = capacity
+if bucket[1] then
+    tokens = math.min(capacity, tonumber(bucket[1]) + math.max(0, now - tonumber(bucket[2])) * refill_per_second)
+end
+local retry_after = 0
+if tokens < 1 then
+    retry_after = (1 - tokens) / refill_per_second
+else
+    tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_per_second))
+return tostring(retry_after)
+"""
+
+class RedisTokenBucketLimiter(TokenBucketLimiter):
+    """Token buckets kept in Redis, so the limit holds across all workers"""
+
+    KEY_PREFIX = "ratelimit:"
+
+    def __init__(self, name: str, capacity: float, refill_per_minute: float, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("Shared rate limits require the redis package") from e
+        self.capacity = capacity
+        self.refill_per_second = refill_per_minute / 60.0
+        self.prefix = f"{self.KEY_PREFIX}{name}:"
+        self._redis = redis.from_url(url)
+        self._take_token = self._redis.register_script(TAKE_TOKEN)
+
+    async def acquire(self, key: str) -> float:
+        # Wall-clock time, since the buckets are shared between hosts
+        retry_after = await self._take_token(
+            keys=[self.prefix + key],
+            args=[self.capacity, self.refill_per_second, time.time()]
+        )
+        return float(retry_after)
+
+def create_rate_limiter(name: str, capacity: float, refill_per_minute: float, backend: str, redis_url: Optional[str]) -> TokenBucketLimiter:
+    """Per-process buckets, or buckets in Redis when backend is redis"""
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("Shared rate limits require REDIS_URL")
+        return RedisTokenBucketLimiter(name, capacity, refill_per_minute, redis_url)
+    return TokenBucketLimiter(capacity, refill_per_minute)
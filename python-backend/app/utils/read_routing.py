@@ -0,0 +1,190 @@
+import asyncio
+import logging
+from typing import Optional
+from fastapi import HTTPException, Request
+from sqlalchemy import text
+from ..config import settings
+from ..database import AsyncSessionLocal, ReplicaSessionLocal, replica_engine
+from ..metrics import Counter, Gauge
+from .auth import decode_access_token
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind. Zero when it has replayed everything it
+# received, so an idle primary does not look like lag.
+REPLICA_LAG = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+replica_lag = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag of the read replica at the last check"
+)
+replica_up = Gauge(
+    "db_replica_up",
+    "1 while read-only routes are sent to the replica, 0 while they fall back to the primary"
+)
+read_sessions = Counter(
+    "db_read_sessions_total",
+    "Sessions handed to read-only routes, by the database they went to",
+    ["target"]
+)
+
+class RecentWriters:
+    """Users who wrote in the last ttl_seconds, remembered in this process"""
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 100000):
+        self._users = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    async def add(self, user_id: str) -> None:
+        self._users.set(user_id, True)
+
+    async def contains(self, user_id: str) -> bool:
+        return self._users.get(user_id) is not None
+
+class RedisRecentWriters(RecentWriters):
+    """Recent writers kept in Redis, so the next request sees them on any worker"""
+
+    KEY_PREFIX = "recent_write:"
+
+    def __init__(self, url: str, ttl_seconds: float):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("Read-your-writes across workers requires the redis package") from e
+        self._redis = redis.from_url(url)
+        self.ttl_ms = max(1, int(ttl_seconds * 1000))
+
+    async def add(self, user_id: str) -> None:
+        await self._redis.set(self.KEY_PREFIX + user_id, 1, px=self.ttl_ms)
+
+    async def contains(self, user_id: str) -> bool:
+        return bool(await self._redis.exists(self.KEY_PREFIX + user_id))
+
+def create_recent_writers(backend: str, redis_url: Optional[str], ttl_seconds: float) -> RecentWriters:
+    """Per-process memory, or Redis when backend is redis"""
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("Read-your-writes across workers requires REDIS_URL")
+        return RedisRecentWriters(redis_url, ttl_seconds)
+    return RecentWriters(ttl_seconds)
+
+class ReadRouter:
+    """Decides whether a read-only route may use the replica.
+
+    A background check measures replication lag; while the replica is down or
+    more than max_lag_seconds behind, every read goes to the primary. A user
+    who just wrote something also reads from the primary for a while after,
+    so they always see their own booking or profile change, whichever worker
+    serves the next request.
+    """
+
+    def __init__(self, max_lag_seconds: float, check_interval_seconds: float, recent_writers: RecentWriters):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.replica_ok = False
+        self.lag_seconds: Optional[float] = None
+        self.recent_writers = recent_writers
+        self._task = None
+
+    async def mark_write(self, user) -> None:
+        """Keep a user's reads on the primary for a while after they wrote"""
+        try:
+            await self.recent_writers.add(str(user.id))
+        except Exception as e:
+            # The write itself has been committed; never fail the request over this
+            logger.warning(f"Could not record a recent write: {e!r}")
+
+    async def use_replica(self, subject: Optional[str]) -> bool:
+        if ReplicaSessionLocal is None or not self.replica_ok:
+            return False
+        if subject is None:
+            return True
+        try:
+            return not await self.recent_writers.contains(subject)
+        except Exception:
+            # Unsure whether they just wrote, so read from the primary
+            return False
+
+    async def _measure_lag(self):
+        async with replica_engine.connect() as connection:
+            return (await connection.execute(REPLICA_LAG)).scalar()
+
+    async def check_replica(self) -> bool:
+        """Measure replica lag and update replica_ok"""
+        try:
+            # A replica that hangs must count as down rather than stall the check
+            lag = await asyncio.wait_for(self._measure_lag(), timeout=max(1.0, self.check_interval_seconds))
+            self.lag_seconds = float(lag or 0)
+            ok = self.lag_seconds <= self.max_lag_seconds
+            replica_lag.set(self.lag_seconds)
+            if not ok and self.replica_ok:
+                logger.warning(f"Read replica is {self.lag_seconds:.1f}s behind, reading from the primary")
+        except Exception as e:
+            ok = False
+            if self.replica_ok:
+                logger.warning(f"Read replica check failed, reading from the primary: {e!r}")
+        if ok and not self.replica_ok:
+            logger.info("Read replica is healthy, routing reads to it")
+        self.replica_ok = ok
+        replica_up.set(1 if ok else 0)
+        return ok
+
+    async def _run(self) -> None:
+        while True:
+            await self.check_replica()
+            await asyncio.sleep(self.check_interval_seconds)
+
+    def start(self) -> None:
+        if replica_engine is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+read_router = ReadRouter(
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.REPLICA_CHECK_INTERVAL_SECONDS,
+    # Shared through Redis whenever the OTP and idempotency stores are, as
+    # is required to run more than one worker
+    recent_writers=create_recent_writers(
+        backend="redis" if settings.shares_state_between_workers else "memory",
+        redis_url=settings.REDIS_URL,
+        ttl_seconds=settings.READ_YOUR_WRITES_SECONDS
+    )
+)
+
+def token_subject(request: Request) -> Optional[str]:
+    """User id from the request's bearer token, if it carries a valid one"""
+    authorization = request.headers.get("authorization")
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        user_id = decode_access_token(authorization[7:].strip()).user_id
+    except HTTPException:
+        return None
+    # Legacy tokens name the user by email or phone, which mark_write does not
+    return str(user_id) if user_id is not None else None
+
+async def get_read_db(request: Request):
+    """Session for read-only routes: the replica when it is usable, else the primary"""
+    if await read_router.use_replica(token_subject(request)):
+        read_sessions.inc(target="replica")
+        async with ReplicaSessionLocal() as db:
+            yield db
+    else:
+        read_sessions.inc(target="primary")
+        async with AsyncSessionLocal() as db:
+            yield db
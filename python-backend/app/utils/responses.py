@@ -0,0 +1,36 @@
+from decimal import Decimal
+from typing import Any, Optional
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+def _default(value: Any) -> Any:
+    """Encode what orjson does not handle natively, the way pydantic's JSON mode would"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Encode a response payload to compact JSON bytes"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson response that also accepts Pydantic models and Decimals"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def envelope(data: Any, message: Optional[str] = None, status_code: int = 200, **extra: Any) -> FastJSONResponse:
+    """Build the standard {"success": true, "message", "data", ...} response.
+
+    The response is serialized here directly, so FastAPI does not re-validate
+    the payload against the route's response_model, which is kept for the docs.
+    """
+    body = {"success": True}
+    if message is not None:
+        body["message"] = message
+    body["data"] = data
+    body.update(extra)
+    return FastJSONResponse(body, status_code=status_code)
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..models.venue import Venue
+from ..schemas.venue import VenueResponse
+from .cache import CachedBody, serialize_json
+from .geo import GeoGrid
+
+logger = logging.getLogger(__name__)
+
+class VenueCatalog:
+    """Every venue held in memory, with pre-encoded list and per-id responses.
+
+    At most once per check interval a cheap fingerprint query (row count and
+    latest created_at/updated_at) is run; the full table is only reloaded
+    when the fingerprint changes, or once it is max_age_seconds old, which
+    catches edits the fingerprint cannot see.
+    """
+
+    def __init__(self, check_interval_seconds: int, max_age_seconds: int = 0):
+        self.check_interval_seconds = check_interval_seconds
+        self.max_age_seconds = max_age_seconds
+        self.venues: Dict[uuid.UUID, VenueResponse] = {}
+        self.list_entry: Optional[CachedBody] = None
+        self.entries: Dict[uuid.UUID, CachedBody] = {}
+        self.grid = GeoGrid()
+        self._fingerprint: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _due(self) -> bool:
+        return self.list_entry is None or time.monotonic() - self._checked_at >= self.check_interval_seconds
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Reload the catalog if the venues table changed since the last check"""
+        if not self._due():
+            return
+        async with self._lock:
+            if not self._due():
+                return
+            try:
+                result = await db.execute(
+                    select(func.count(Venue.id), func.max(Venue.updated_at), func.max(Venue.created_at))
+                )
+                fingerprint = tuple(result.one())
+                expired = self.max_age_seconds > 0 and time.monotonic() - self._loaded_at >= self.max_age_seconds
+                if fingerprint != self._fingerprint or self.list_entry is None or expired:
+                    await self._reload(db)
+                    self._fingerprint = fingerprint
+            except Exception:
+                if self.list_entry is None:
+                    raise
+                logger.exception("Refreshing venue catalog failed, serving stale copy")
+            self._checked_at = time.monotonic()
+
+    async def _reload(self, db: AsyncSession) -> None:
+        result = await db.execute(select(Venue).order_by(Venue.created_at.desc(), Venue.id.desc()))
+        venues = [VenueResponse.model_validate(venue) for venue in result.scalars().all()]
+
+        entries = {}
+        for venue in venues:
+            entries[venue.id] = CachedBody(
+                serialize_json({"success": True, "data": venue}),
+                last_modified=venue.updated_at or venue.created_at
+            )
+        modified = [venue.updated_at or venue.created_at for venue in venues if venue.updated_at or venue.created_at]
+
+        # Swap everything in at once so readers never see a half-built catalog
+        self.venues = {venue.id: venue for venue in venues}
+        self.entries = entries
+        self.grid = GeoGrid.build((venue.latitude, venue.longitude, venue) for venue in venues)
+        self.list_entry = CachedBody(
+            serialize_json({"success": True, "data": venues}),
+            last_modified=max(modified) if modified else None
+        )
+        self._loaded_at = time.monotonic()
+        logger.info(f"Venue catalog loaded: {len(venues)} venues")
+
+    def get(self, venue_id: uuid.UUID) -> Optional[VenueResponse]:
+        return self.venues.get(venue_id)
+
+    def get_entry(self, venue_id: uuid.UUID) -> Optional[CachedBody]:
+        return self.entries.get(venue_id)
+
+    def invalidate(self) -> None:
+        """Force a full reload on the next request"""
+        self.list_entry = None
+        self._fingerprint = None
+
+venue_catalog = VenueCatalog(
+    check_interval_seconds=settings.VENUE_CATALOG_CHECK_SECONDS,
+    max_age_seconds=settings.VENUE_CATALOG_MAX_AGE_SECONDS
+)
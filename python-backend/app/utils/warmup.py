@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import QueuePool
+from ..database import AsyncSessionLocal, async_engine, test_connection
+from ..metrics import Gauge
+from .auth import get_pwd_context, get_token_backend
+
+logger = logging.getLogger(__name__)
+
+worker_ready = Gauge(
+    "worker_ready",
+    "1 once the worker's startup warm-up has finished"
+)
+
+class Warmup:
+    """Gets a worker ready for traffic without holding up startup.
+
+    Runs in the background after the server starts listening: waits for the
+    database (retrying while it is unreachable), opens the pool's standing
+    connections, builds the password hasher and JWT backend, and loads the
+    in-memory caches. /health/ready answers 503 until it has finished.
+    """
+
+    def __init__(self, retry_seconds: float = 1.0, max_retry_seconds: float = 30.0):
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._steps: List[Tuple[str, Callable[[AsyncSession], Awaitable]]] = []
+        self._task = None
+
+    def add(self, name: str, step: Callable[[AsyncSession], Awaitable]) -> None:
+        """Run step(db) as part of the warm-up, e.g. to load a cache"""
+        self._steps.append((name, step))
+
+    async def _wait_for_database(self) -> None:
+        delay = self.retry_seconds
+        while not await test_connection():
+            logger.warning(f"Database not reachable yet, retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_seconds)
+
+    async def _fill_pool(self) -> None:
+        """Open the pool's standing connections together rather than on the first requests"""
+        pool = async_engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+        missing = pool.size() - pool.checkedin() - pool.checkedout()
+        if missing <= 0:
+            return
+        connections = await asyncio.gather(*(async_engine.connect() for _ in range(missing)), return_exceptions=True)
+        for connection in connections:
+            if isinstance(connection, BaseException):
+                logger.warning(f"Could not pre-open a database connection: {connection!r}")
+                continue
+            await connection.execute(text("SELECT 1"))
+            await connection.close()
+
+    async def _run(self) -> None:
+        self.started_at = time.perf_counter()
+        # Importing passlib, jose and cryptography takes a while, so do it
+        # off the event loop while the database is still being reached
+        helpers = asyncio.create_task(asyncio.to_thread(lambda: (get_pwd_context(), get_token_backend())))
+        await self._wait_for_database()
+        await self._fill_pool()
+        async with AsyncSessionLocal() as db:
+            for name, step in self._steps:
+                try:
+                    await step(db)
+                except Exception as e:
+                    # A cold cache only makes the first requests slower
+                    logger.warning(f"Warm-up step {name} failed: {e!r}")
+        try:
+            await helpers
+        except Exception as e:
+            # Every login and token check would fail, so never report ready
+            logger.error(f"❌ Could not set up password hashing or JWT handling: {e!r}")
+            return
+        self.finished_at = time.perf_counter()
+        self.ready = True
+        worker_ready.set(1)
+        logger.info(f"✅ Worker ready after {self.finished_at - self.started_at:.2f}s of warm-up")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+warmup = Warmup()
@@ -0,0 +1,82 @@
+"""Check that importing the app stays within a time budget.
+
+Usage (from python-backend/):
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 1200 --runs 5 --top 15
+
+Each run imports app.main in a fresh interpreter with -X importtime. The
+fastest run is compared with the budget, and the slowest modules are listed
+so a regression can be traced to the import that caused it. Exits with
+status 1 when the budget is exceeded, or when a module that should load
+lazily (passlib, jose, psycopg2) is imported, so it can gate CI. Import time
+depends on the machine, so set --budget-ms for the one it runs on.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules that must not be loaded just by importing the app
+LAZY_MODULES = ("jose", "passlib", "psycopg2", "cryptography")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="module to import")
+    parser.add_argument("--budget-ms", type=float, default=2500, help="fail when the fastest run takes longer")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="modules to list by self time")
+    return parser.parse_args(argv)
+
+def import_once(module: str) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+    """{module: (self_us, cumulative_us)} and the lazy modules that got loaded"""
+    check = f"import sys, {module}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ)
+    # Settings require these; the values are never used to connect
+    env.setdefault("DATABASE_URL", "postgresql://localhost/import_time")
+    env.setdefault("SECRET_KEY", "import-time")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return timings, loaded
+
+def main(argv=None):
+    args = parse_args(argv)
+    runs = [import_once(args.module) for _ in range(args.runs)]
+    totals = [timings[args.module][1] / 1000 for timings, _ in runs]
+    fastest, loaded = min(runs, key=lambda run: run[0][args.module][1])
+
+    print(f"import {args.module}: fastest {min(totals):.0f} ms, slowest {max(totals):.0f} ms over {args.runs} runs")
+    print("\nSlowest modules by self time (fastest run):")
+    slowest = sorted(fastest.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {self_us / 1000:8.1f} ms  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+    failed = False
+    if loaded:
+        print(f"\nFAIL: importing {args.module} loaded {', '.join(loaded)}, which should only load on first use")
+        failed = True
+    if min(totals) > args.budget_ms:
+        print(f"\nFAIL: {min(totals):.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"\nOK: within the {args.budget_ms:.0f} ms budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Load-test the API and report latency percentiles and throughput per endpoint.
+
+Usage (from python-backend/):
+
+    python -m benchmarks.run --pgserver /tmp/bench-pg
+    python -m benchmarks.run --database-url postgresql://postgres@localhost/myrush_bench
+    python -m benchmarks.run --database-url ... --compare benchmarks/results/abc1234.json
+
+The target database is wiped and reseeded, so never point it at real data.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--database-url", help="PostgreSQL database to wipe, seed and benchmark against")
+    target.add_argument("--pgserver", metavar="DIR", help="run a throwaway PostgreSQL in DIR with the pgserver package")
+    parser.add_argument("--url", help="benchmark a running server at this base URL instead of the app in-process")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--venues", type=int, default=300)
+    parser.add_argument("--bookings", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=14, help="bookings are spread over this many days either side of today")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse data from a previous run")
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users sending requests back to back")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of load before measuring")
+    parser.add_argument("--mix", help="scenario weights, e.g. venue_list=5,my_bookings=3,booking_create=1")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    return parser.parse_args(argv)
+
+def start_pgserver(directory: str) -> str:
+    try:
+        import pgserver
+    except ImportError:
+        sys.exit("--pgserver needs the pgserver package (pip install pgserver)")
+    server = pgserver.get_server(directory, cleanup_mode=None)
+    if "myrush_bench" not in server.psql("SELECT datname FROM pg_database;"):
+        server.psql("CREATE DATABASE myrush_bench;")
+    return server.get_uri("myrush_bench")
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(samples, elapsed: float, expected: Dict[str, set]) -> Dict[str, dict]:
+    by_endpoint = defaultdict(list)
+    for name, status, seconds in samples:
+        by_endpoint[name].append((status, seconds))
+    by_endpoint["all"] = [(status, seconds) for _, status, seconds in samples]
+
+    summary = {}
+    for name, results in sorted(by_endpoint.items()):
+        latencies = sorted(seconds for _, seconds in results)
+        statuses = defaultdict(int)
+        for status, _ in results:
+            statuses[str(status)] += 1
+        ok = expected.get(name, {200})
+        errors = sum(1 for status, _ in results if status not in ok) if name != "all" else None
+        summary[name] = {
+            "requests": len(results),
+            "rps": round(len(results) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            "errors": errors,
+            "status": dict(statuses),
+        }
+    return summary
+
+def print_table(summary: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None) -> None:
+    header = f"{'endpoint':<16}{'requests':>10}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    if baseline:
+        header += f"{'p95 vs base':>14}{'rps vs base':>14}"
+    print(header)
+    print("-" * len(header))
+    for name, row in summary.items():
+        line = (
+            f"{name:<16}{row['requests']:>10}{row['rps']:>10}{row['p50_ms']:>10}"
+            f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['errors'] if row['errors'] is not None else '':>8}"
+        )
+        base = (baseline or {}).get(name)
+        if base:
+            p95_change = (row["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+            rps_change = (row["rps"] - base["rps"]) / base["rps"] * 100 if base["rps"] else 0.0
+            line += f"{p95_change:>+13.1f}%{rps_change:>+13.1f}%"
+        print(line)
+
+class Client:
+    """httpx client plus the clock used for timing"""
+
+    def __init__(self, http):
+        self.http = http
+        self.clock = time.perf_counter
+
+    async def request(self, method, url, **kwargs):
+        return await self.http.request(method, url, **kwargs)
+
+async def drive(client, ctx, mix, concurrency: int, warmup: float, duration: float, seed: int):
+    from .scenarios import picker
+
+    samples = []
+    measuring = False
+    deadline = time.perf_counter() + warmup + duration
+
+    async def virtual_user(index: int):
+        rng = random.Random(seed + index)
+        pick = picker(mix, rng)
+        while time.perf_counter() < deadline:
+            batch = []
+            try:
+                await pick()(client, ctx, rng, batch)
+            except Exception as e:
+                batch.append(("exception", 0, 0.0))
+                print(f"request failed: {e!r}", file=sys.stderr)
+            if measuring:
+                samples.extend(batch)
+
+    tasks = [asyncio.create_task(virtual_user(i)) for i in range(concurrency)]
+    await asyncio.sleep(warmup)
+    measuring = True
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return samples, time.perf_counter() - started
+
+async def main_async(args, database_url: str) -> dict:
+    import httpx
+    from sqlalchemy import create_engine
+    from .scenarios import DEFAULT_MIX, EXPECTED_STATUS, ScenarioContext, parse_mix
+    from .seed import EMAIL_DOMAIN, reset_schema, seed
+
+    seed_engine = create_engine(database_url)
+    if args.skip_seed:
+        from sqlalchemy import text
+        with seed_engine.connect() as connection:
+            users = [tuple(row) for row in connection.execute(text("SELECT id, email FROM users WHERE email LIKE :pattern"), {"pattern": f"%@{EMAIL_DOMAIN}"})]
+            venues = [row[0] for row in connection.execute(text("SELECT id FROM adminvenues ORDER BY created_at DESC"))]
+        seeded = {"users": users, "venues": venues, "bookings": None}
+    else:
+        print(f"Seeding {args.users} users, {args.venues} venues, {args.bookings} bookings...")
+        reset_schema(seed_engine)
+        seeded = seed(seed_engine, args.users, args.venues, args.bookings, args.days, args.seed)
+    seed_engine.dispose()
+
+    from app.utils.auth import create_access_token
+    tokens = [create_access_token({"sub": str(user_id)}) for user_id, _ in seeded["users"][:500]]
+    ctx = ScenarioContext(seeded["users"], tokens, seeded["venues"])
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+
+    if args.url:
+        http = httpx.AsyncClient(base_url=args.url, timeout=30, limits=httpx.Limits(max_connections=args.concurrency))
+        app = None
+    else:
+        from app.main import app
+        await app.router.startup()
+        http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+
+    try:
+        print(f"Running {args.concurrency} virtual users for {args.warmup}s warm-up + {args.duration}s...")
+        samples, elapsed = await drive(Client(http), ctx, mix, args.concurrency, args.warmup, args.duration, args.seed)
+    finally:
+        await http.aclose()
+        if app is not None:
+            await app.router.shutdown()
+
+    return {
+        "commit": git_commit(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "target": "http" if args.url else "in-process",
+        "config": {
+            "users": len(seeded["users"]),
+            "venues": len(seeded["venues"]),
+            "bookings": seeded["bookings"],
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "endpoints": summarize(samples, elapsed, EXPECTED_STATUS),
+    }
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or start_pgserver(args.pgserver)
+
+    # The app reads its settings at import time, so configure it first.
+    # Rate limits are lifted because every virtual user shares one client IP.
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("OTP_IP_BURST", "1000000000")
+    os.environ.setdefault("OTP_IP_REFILL_PER_MINUTE", "1000000000")
+    os.environ.setdefault("OTP_AUDIT_ENABLED", "false")
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+    results = asyncio.run(main_async(args, database_url))
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["endpoints"]
+    print()
+    print_table(results["endpoints"], baseline)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{results['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, default=str))
+    print(f"\nResults saved to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Weighted request scenarios driven against the API"""
+import random
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, Tuple
+from .seed import CITY_CENTERS, PASSWORD
+
+# (endpoint name, status code, seconds) for each request a scenario made
+Sample = Tuple[str, int, float]
+
+# Status codes that are a normal outcome rather than an error
+EXPECTED_STATUS = {
+    "booking_create": {200, 400},  # 400 is a lost race for a contended slot
+    "login": {200, 503},  # 503 is the password hashing pool shedding load
+}
+
+DEFAULT_MIX = {
+    "venue_list": 25,
+    "venue_page": 10,
+    "venue_detail": 10,
+    "availability": 15,
+    "my_bookings": 20,
+    "booking_create": 10,
+    "otp": 5,
+    "login": 5,
+}
+
+class ScenarioContext:
+    """Seeded ids and tokens shared by all virtual users"""
+
+    def __init__(self, users: List[tuple], tokens: List[str], venues: List, hot_venues: int = 3):
+        self.users = users
+        self.tokens = tokens
+        self.venues = [str(venue_id) for venue_id in venues]
+        # A few popular venues and evenings that everyone fights over
+        self.hot_venues = self.venues[:hot_venues]
+        self.hot_date = (date.today() + timedelta(days=30)).isoformat()
+
+async def timed(client, samples: List[Sample], name: str, method: str, url: str, **kwargs):
+    started = client.clock()
+    response = await client.request(method, url, **kwargs)
+    samples.append((name, response.status_code, client.clock() - started))
+    return response
+
+async def venue_list(client, ctx, rng, samples):
+    await timed(client, samples, "venue_list", "GET", "/api/v1/venues/")
+
+async def venue_page(client, ctx, rng, samples):
+    params = {"limit": 20, "city": rng.choice(["Hyderabad", "Bengaluru", "Pune"])}
+    response = await timed(client, samples, "venue_page", "GET", "/api/v1/venues/", params=params)
+    cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+    if cursor:
+        params["cursor"] = cursor
+        await timed(client, samples, "venue_page", "GET", "/api/v1/venues/", params=params)
+
+async def venue_detail(client, ctx, rng, samples):
+    await timed(client, samples, "venue_detail", "GET", f"/api/v1/venues/{rng.choice(ctx.venues)}")
+
+async def nearby(client, ctx, rng, samples):
+    lat, lng = rng.choice(list(CITY_CENTERS.values()))
+    params = {"lat": lat + rng.uniform(-0.1, 0.1), "lng": lng + rng.uniform(-0.1, 0.1), "radius": rng.choice([5, 10, 25])}
+    await timed(client, samples, "nearby", "GET", "/api/v1/venues/nearby", params=params)
+
+async def availability(client, ctx, rng, samples):
+    day = (date.today() + timedelta(days=rng.randint(0, 6))).isoformat()
+    await timed(
+        client, samples, "availability", "GET",
+        f"/api/v1/venues/{rng.choice(ctx.venues)}/availability", params={"date": day}
+    )
+
+async def quote(client, ctx, rng, samples):
+    day = (date.today() + timedelta(days=rng.randint(0, 6))).isoformat()
+    params = [("date", day), ("duration_minutes", rng.choice([60, 90]))]
+    params += [("start_time", f"{hour:02d}:00") for hour in rng.sample(range(6, 23), 3)]
+    await timed(client, samples, "quote", "GET", f"/api/v1/venues/{rng.choice(ctx.venues)}/quote", params=params)
+
+async def my_bookings(client, ctx, rng, samples):
+    headers = {"Authorization": f"Bearer {rng.choice(ctx.tokens)}"}
+    await timed(client, samples, "my_bookings", "GET", "/api/v1/bookings/my-bookings", headers=headers)
+
+async def booking_create(client, ctx, rng, samples):
+    headers = {"Authorization": f"Bearer {rng.choice(ctx.tokens)}"}
+    body = {
+        "venue_id": rng.choice(ctx.hot_venues),
+        "booking_date": ctx.hot_date,
+        "start_time": f"{rng.randint(17, 22):02d}:00",
+        "duration_minutes": rng.choice([60, 90]),
+    }
+    await timed(client, samples, "booking_create", "POST", "/api/v1/bookings/", json=body, headers=headers)
+
+async def otp(client, ctx, rng, samples):
+    phone = f"8{rng.randrange(10 ** 9):09d}"
+    await timed(client, samples, "otp_send", "POST", "/api/v1/otp/send", json={"phone_number": phone})
+    await timed(client, samples, "otp_verify", "POST", "/api/v1/otp/verify", json={"phone_number": phone, "otp_code": "12345"})
+
+async def login(client, ctx, rng, samples):
+    _, email = rng.choice(ctx.users)
+    await timed(client, samples, "login", "POST", "/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+
+SCENARIOS: Dict[str, Callable[..., Awaitable[None]]] = {
+    "venue_list": venue_list,
+    "venue_page": venue_page,
+    "venue_detail": venue_detail,
+    "nearby": nearby,
+    "availability": availability,
+    "quote": quote,
+    "my_bookings": my_bookings,
+    "booking_create": booking_create,
+    "otp": otp,
+    "login": login,
+}
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse "venue_list=5,login=1" into scenario weights"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}, expected one of: {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def picker(mix: Dict[str, float], rng: random.Random):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    return lambda: SCENARIOS[rng.choices(names, weights)[0]]
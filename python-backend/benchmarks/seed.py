@@ -0,0 +1,191 @@
+"""Schema setup and realistic seed data for the benchmark database"""
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import insert, text
+
+# Indexes the Supabase migrations add on top of the model definitions
+MIGRATION_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_users_phone_number ON users(phone_number)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_venue_id ON booking(venue_id)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_date ON booking(booking_date)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_status ON booking(status)",
+    # 011_add_venue_listing_indexes.sql
+    "CREATE INDEX IF NOT EXISTS idx_adminvenues_created_at_id ON adminvenues(created_at DESC, id DESC)",
+    # 012_add_booking_user_date_index.sql
+    "CREATE INDEX IF NOT EXISTS idx_bookings_user_date_time ON booking(user_id, booking_date DESC, start_time DESC, id DESC)",
+    # 015_add_venue_coordinates.sql
+    "CREATE INDEX IF NOT EXISTS idx_adminvenues_lat_lng ON adminvenues(latitude, longitude) WHERE latitude IS NOT NULL",
+]
+TRGM_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_adminvenues_game_type_trgm ON adminvenues USING gin (game_type gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_adminvenues_location_trgm ON adminvenues USING gin (location gin_trgm_ops)",
+]
+
+# Without btree_gist a GiST exclusion constraint cannot compare venue_id
+# with =. This stand-in maps each booking to a degenerate box whose x axis is
+# its time range (less a millisecond, since boxes include their edges) and
+# whose y coordinate is a hash of the venue, so the constraint still rejects
+# exactly the bookings that overlap at the same venue.
+BOX_OVERLAP_CONSTRAINT = """
+ALTER TABLE booking ADD CONSTRAINT booking_no_overlap EXCLUDE USING gist (
+  box(
+    point(date_part('epoch', booking_date + start_time), hashtext(venue_id::text)),
+    point(date_part('epoch', booking_date + end_time
+            + CASE WHEN end_time <= start_time THEN INTERVAL '1 day' ELSE INTERVAL '0' END) - 0.001,
+          hashtext(venue_id::text))
+  ) WITH &&
+) WHERE (status NOT IN ('cancelled', 'refunded'))
+"""
+
+CITY_CENTERS = {
+    "Hyderabad": (17.385, 78.487),
+    "Bengaluru": (12.972, 77.594),
+    "Chennai": (13.083, 80.271),
+    "Mumbai": (19.076, 72.878),
+    "Pune": (18.520, 73.857),
+    "Delhi": (28.614, 77.209),
+}
+CITIES = list(CITY_CENTERS)
+AREAS = ["Gachibowli", "Kondapur", "Indiranagar", "Whitefield", "Adyar", "Andheri", "Baner", "Saket"]
+GAME_TYPES = ["Football", "Tennis", "Badminton", "Cricket", "Basketball", "Pickleball"]
+
+PASSWORD = "benchpass"
+EMAIL_DOMAIN = "bench.example.com"
+OPEN_HOUR = 6
+CLOSE_HOUR = 23
+
+def extension_available(connection, name: str) -> bool:
+    return connection.execute(
+        text("SELECT 1 FROM pg_available_extensions WHERE name = :name"), {"name": name}
+    ).first() is not None
+
+def reset_schema(engine) -> None:
+    """Drop and recreate every table the app uses"""
+    from app.database import Base
+    from app.models import Booking
+    from sqlalchemy.dialects.postgresql import ExcludeConstraint
+
+    with engine.begin() as connection:
+        has_btree_gist = extension_available(connection, "btree_gist")
+        has_trgm = extension_available(connection, "pg_trgm")
+        if has_btree_gist:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        if has_trgm:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    Base.metadata.drop_all(engine)
+    exclusion = [c for c in Booking.__table__.constraints if isinstance(c, ExcludeConstraint)]
+    if not has_btree_gist:
+        print("btree_gist is not available, using a box-based overlap constraint")
+        for constraint in exclusion:
+            Booking.__table__.constraints.discard(constraint)
+    try:
+        Base.metadata.create_all(engine)
+    finally:
+        for constraint in exclusion:
+            Booking.__table__.constraints.add(constraint)
+
+    with engine.begin() as connection:
+        if not has_btree_gist:
+            connection.execute(text(BOX_OVERLAP_CONSTRAINT))
+        for statement in MIGRATION_INDEXES + (TRGM_INDEXES if has_trgm else []):
+            connection.execute(text(statement))
+
+def _chunks(rows, size=5000):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+def seed(engine, users: int, venues: int, bookings: int, days: int, seed: int = 42) -> dict:
+    """Insert users, venues, lookups and non-overlapping bookings; returns the ids for the scenarios"""
+    from app.models import Booking, City, GameType, User, Venue
+    from app.utils.auth import get_password_hash
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    password_hash = get_password_hash(PASSWORD)
+
+    user_rows = [
+        {
+            "id": uuid.uuid4(),
+            "email": f"user{i}@{EMAIL_DOMAIN}",
+            "phone_number": f"9{i:09d}",
+            "password_hash": password_hash,
+            "first_name": "Bench",
+            "last_name": f"User{i}",
+            "full_name": f"Bench User{i}",
+            "is_verified": True,
+            "is_active": True,
+            "profile_completed": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(users)
+    ]
+    venue_rows = []
+    for i in range(venues):
+        created = now - timedelta(minutes=venues - i)
+        city = rng.choice(CITIES)
+        lat, lng = CITY_CENTERS[city]
+        venue_rows.append({
+            "id": uuid.uuid4(),
+            "game_type": rng.choice(GAME_TYPES),
+            "court_name": f"Court {i}",
+            "location": f"{rng.choice(AREAS)}, {city}",
+            # Scattered up to ~20 km around the city centre
+            "latitude": lat + rng.uniform(-0.18, 0.18),
+            "longitude": lng + rng.uniform(-0.18, 0.18),
+            "prices": str(rng.choice([600, 800, 1000, 1200, 1500])),
+            "description": "Floodlit court with changing rooms and parking. " * 3,
+            "photos": [f"https://cdn.example.com/venues/{i}/{n}.jpg" for n in range(4)],
+            "videos": [f"https://cdn.example.com/venues/{i}/tour.mp4"],
+            "created_at": created,
+            "updated_at": created,
+        })
+
+    # Distinct hourly slots per venue and day, so no two bookings overlap
+    slots = [
+        (venue_index, day, hour)
+        for venue_index in range(venues)
+        for day in range(-days, days)
+        for hour in range(OPEN_HOUR, CLOSE_HOUR)
+    ]
+    chosen = rng.sample(slots, min(bookings, len(slots)))
+    today = date.today()
+    booking_rows = []
+    for venue_index, day, hour in chosen:
+        venue = venue_rows[venue_index]
+        price = float(venue["prices"])
+        booking_rows.append({
+            "id": uuid.uuid4(),
+            "user_id": rng.choice(user_rows)["id"],
+            "venue_id": venue["id"],
+            "booking_date": today + timedelta(days=day),
+            "start_time": time(hour),
+            "end_time": time(hour + 1),
+            "duration_minutes": 60,
+            "number_of_players": rng.randint(2, 10),
+            "price_per_hour": price,
+            "total_amount": price,
+            "status": rng.choice(["pending", "confirmed", "confirmed", "completed", "cancelled"]),
+            "payment_status": "pending",
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    with engine.begin() as connection:
+        connection.execute(insert(City), [{"id": uuid.uuid4(), "name": name, "is_active": True} for name in CITIES])
+        connection.execute(insert(GameType), [{"id": uuid.uuid4(), "name": name, "is_active": True} for name in GAME_TYPES])
+        for chunk in _chunks(user_rows):
+            connection.execute(insert(User), chunk)
+        for chunk in _chunks(venue_rows):
+            connection.execute(insert(Venue), chunk)
+        for chunk in _chunks(booking_rows):
+            connection.execute(insert(Booking), chunk)
+        connection.execute(text("ANALYZE"))
+
+    return {
+        "users": [(row["id"], row["email"]) for row in user_rows],
+        "venues": [row["id"] for row in venue_rows],
+        "bookings": len(booking_rows),
+    }
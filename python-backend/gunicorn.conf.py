@@ -0,0 +1,49 @@
+"""Gunicorn settings for production.
+
+    python server.py                          # with ENVIRONMENT=production
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Every value comes from app.config.settings, so the worker count used here is
+the same one the app divides DB_CONNECTION_BUDGET by.
+"""
+from app.config import settings
+
+bind = f"{settings.HOST}:{settings.PORT}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = settings.worker_count
+
+# Believe X-Forwarded-For only from these; app.routes.otp.client_ip uses the same list
+forwarded_allow_ips = ",".join(settings.trusted_proxy_ips)
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+
+# Recycle workers to bound slow memory growth; the jitter staggers restarts
+max_requests = settings.MAX_REQUESTS_PER_WORKER
+max_requests_jitter = settings.MAX_REQUESTS_JITTER if settings.MAX_REQUESTS_PER_WORKER else 0
+
+# On SIGTERM workers stop accepting connections and get this long to finish
+# the requests they are serving before being killed
+graceful_timeout = settings.GRACEFUL_TIMEOUT_SECONDS
+timeout = 60
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+def on_starting(server):
+    if settings.WEB_CONCURRENCY == 0 and workers == 1 and not settings.is_development:
+        if not settings.shares_state_between_workers:
+            server.log.warning(
+                "Running a single worker: OTP codes or idempotency keys are kept in process "
+                "memory. Set OTP_STORE_BACKEND=redis and IDEMPOTENCY_STORE_BACKEND=redis to run more."
+            )
+
+def post_fork(server, worker):
+    # Connections must never be shared across processes. Drop any pool
+    # inherited from the master without closing its sockets, so each worker
+    # opens its own connections on first use.
+    from app.database import async_engine, replica_engine
+    async_engine.sync_engine.dispose(close=False)
+    if replica_engine is not None:
+        replica_engine.sync_engine.dispose(close=False)
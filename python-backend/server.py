@@ -1,11 +1,19 @@
+import os
+import sys
 import uvicorn
 from app.config import settings
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=True,  # Enable auto-reload for development
-        log_level="info"
-    )
+    if settings.is_development:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=True,  # Enable auto-reload for development
+            forwarded_allow_ips=",".join(settings.trusted_proxy_ips),
+            log_level="info"
+        )
+    else:
+        # Multi-worker production server, configured in gunicorn.conf.py
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        os.execvp("gunicorn", ["gunicorn", "-c", "gunicorn.conf.py", "app.main:app"] + sys.argv[1:])